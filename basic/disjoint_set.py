@@ -1,4 +1,27 @@
+"""
+Disjoint Set
+============
+
+Disjoint-set data structure (also called **union-find**) maintains a collection of
+disjoint dynamic sets. Each set is identified by a **representative**, which is some
+member of the set. Two main operations are finding the representative of the set an
+element belongs to, and uniting two sets.
+
+Disjoint-set forest represents each set as a rooted tree, in which each member points
+only to its parent, and the root is the representative. Two heuristics keep the trees
+flat. **Union by rank** (or by size) makes the root of a smaller tree point to the root of
+a larger tree. **Path compression** makes the nodes on the find path point closer to the
+root. With both heuristics, a sequence of :math:`m` operations on :math:`n` elements runs
+in :math:`O(m\\alpha(n))` time, where :math:`\\alpha(n)` is the very slowly growing
+inverse Ackermann function.
+"""
+from array import array
+
+
 class Node:
+    """Element of a disjoint-set forest with a pointer to its parent and a rank.
+    """
+
     def __init__(self, v):
         self.v = v
         self.p = None
@@ -46,10 +69,138 @@ def link(x, y):
 def find_set(x):
     """Finds the root of the element's set.
 
+    Makes two passes up the find path: first pass locates the root, second pass updates
+    each node to point directly to the root. Iterative path compression does not run into
+    the recursion limit on long chains.
+
     :param basic.disjoint_set.Node x:
     :return: Root of the set.
 
     """
-    if x != x.p:
-        x.p = find_set(x.p)
-    return x.p
+    r = x
+    while r is not r.p:
+        r = r.p
+    while x is not r:
+        x.p, x = r, x.p
+    return r
+
+
+class DisjointSet:
+    """Array-backed disjoint-set forest of integer elements :math:`0..n-1`.
+
+    Parents and set sizes are stored in flat arrays, so that no objects are allocated per
+    element. Sets are united by size, and :meth:`find()` uses **path halving**: every node
+    on the find path is made to point to its grandparent. Path halving needs a single pass
+    and no recursion, and has the same asymptotic bounds as full path compression.
+    """
+
+    def __init__(self, n):
+        """Array-backed disjoint-set forest of integer elements :math:`0..n-1`.
+
+        :param int n: Number of elements, each in its own set.
+
+        """
+        self.p = array('q', range(n))  # Parents
+        self.size = array('q', [1]) * n  # Set sizes, valid for roots only
+        self.count = n  # Number of sets
+
+    def find(self, x):
+        """Finds the root of the element's set.
+
+        Complexity:
+            :math:`O(\\alpha(n))` amortized.
+
+        :param int x: Element.
+        :return: Root of the set.
+
+        """
+        p = self.p
+        while p[x] != x:
+            p[x] = p[p[x]]  # Path halving
+            x = p[x]
+        return x
+
+    def union(self, x, y):
+        """Unites the sets of two elements.
+
+        Complexity:
+            :math:`O(\\alpha(n))` amortized.
+
+        :param int x: Element.
+        :param int y: Element.
+        :return: :data:`True` if the sets were united, :data:`False` if the elements
+         already were in the same set.
+
+        """
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+        self.p[y] = x  # Smaller tree is linked under the larger one
+        self.size[x] += self.size[y]
+        self.count -= 1
+        return True
+
+    def union_many(self, X, Y):
+        """Unites the sets of pairs of elements.
+
+        The loop is inlined with local references to the arrays to reduce the interpreter
+        overhead per pair.
+
+        Complexity:
+            :math:`O(k\\alpha(n))` amortized for :math:`k` pairs.
+
+        :param iterable X: Elements.
+        :param iterable Y: Elements paired with ``X``.
+        :return: Number of pairs that united two different sets.
+
+        """
+        p, size = self.p, self.size
+        k = 0
+        for x, y in zip(X, Y):
+            while p[x] != x:
+                p[x] = p[p[x]]
+                x = p[x]
+            while p[y] != y:
+                p[y] = p[p[y]]
+                y = p[y]
+            if x != y:
+                if size[x] < size[y]:
+                    x, y = y, x
+                p[y] = x
+                size[x] += size[y]
+                k += 1
+        self.count -= k
+        return k
+
+    def find_many(self, X):
+        """Finds the roots of the sets of several elements.
+
+        Complexity:
+            :math:`O(k\\alpha(n))` amortized for :math:`k` elements.
+
+        :param iterable X: Elements.
+        :return: Array of roots aligned with ``X``.
+
+        """
+        p = self.p
+        R = array('q')
+        for x in X:
+            while p[x] != x:
+                p[x] = p[p[x]]
+                x = p[x]
+            R.append(x)
+        return R
+
+    def set_size(self, x):
+        """Returns the number of elements in the element's set.
+
+        Complexity:
+            :math:`O(\\alpha(n))` amortized.
+
+        :param int x: Element.
+        :return: Size of the set.
+
+        """
+        return self.size[self.find(x)]
@@ -138,3 +138,151 @@ def max_heap_insert(A, z):
     i_n = n - 1  # Index of last element
     if n > 1:
         max_heap_increase_key(A, i_n)
+
+
+class IndexedHeap:
+    """Addressable min-priority queue.
+
+    Basic binary heap cannot locate an element without scanning the whole array, so the
+    priority of a queued element cannot be changed efficiently. Indexed heap keeps a
+    **position map** of every element alongside the heap array, which is updated on every
+    exchange of elements. This allows membership tests in :math:`O(1)` time and priority
+    updates in :math:`O(\log n)` time.
+
+    Elements must be hashable. Priority keys are kept separately from the elements, so the
+    elements themselves do not need to be comparable.
+    """
+
+    def __init__(self):
+        """Addressable min-priority queue.
+        """
+        self.A = []  # Heap array of elements
+        self.key = {}  # Priority keys, keyed by element
+        self.pos = {}  # Indices of elements in a heap array, keyed by element
+
+
+def indexed_heap_contains(H, x):
+    """Checks whether the element is in a heap.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param IndexedHeap H: Indexed heap.
+    :param object x: Subject element.
+    :return: :data:`True` if element is in a heap, :data:`False` otherwise.
+
+    """
+    return x in H.pos
+
+
+def indexed_heap_insert(H, x, k):
+    """Inserts a new element with a given priority key into a heap.
+
+    Complexity:
+        :math:`O(\log n)`.
+
+    :param IndexedHeap H: Indexed heap.
+    :param object x: A new element.
+    :param object k: Priority key of an element.
+
+    """
+    if x in H.pos:
+        raise ValueError("Element is already in a heap")
+    H.A.append(x)
+    H.key[x] = k
+    H.pos[x] = len(H.A) - 1
+    indexed_heap_bubble_up(H, len(H.A) - 1)
+
+
+def indexed_heap_extract_min(H):
+    """Removes the element with a minimum key from the top of the heap and returns it.
+
+    Complexity:
+        :math:`O(\log n)`.
+
+    :param IndexedHeap H: Indexed heap.
+    :return: Element with a minimum priority key.
+
+    """
+    A = H.A
+    if len(A) < 1:
+        raise ValueError("Heap underflow")
+    m = A[0]
+    x = A.pop()  # Move bottom element to the top
+    if len(A) > 0:
+        A[0] = x
+        H.pos[x] = 0
+        indexed_heapify(H, 0)
+    del H.pos[m]
+    del H.key[m]
+    return m
+
+
+def indexed_heap_decrease_key(H, x, k):
+    """Decreases the priority key of an element and restores heap properties.
+
+    Position map makes it possible to locate an element in constant time, after that the
+    element is made to "bubble up" to its new position.
+
+    Complexity:
+        :math:`O(\log n)`.
+
+    :param IndexedHeap H: Indexed heap.
+    :param object x: Queued element.
+    :param object k: New priority key, not larger than the current one.
+
+    """
+    if k > H.key[x]:
+        raise ValueError("New key is larger than current key")
+    H.key[x] = k
+    indexed_heap_bubble_up(H, H.pos[x])
+
+
+def indexed_heapify(H, i):
+    """Lets the element at a given index "sink" in the min-heap.
+
+    Iterative counterpart of :func:`max_heapify()` for indexed min-heap that updates the
+    position map on every exchange.
+
+    Complexity:
+        :math:`O(\log n)`.
+
+    :param IndexedHeap H: Indexed heap.
+    :param int i: Integer index of an element to "sink".
+
+    """
+    A, key, pos = H.A, H.key, H.pos
+    n = len(A)
+    while True:
+        l = 2 * i + 1  # Index of a left child
+        r = 2 * i + 2  # Index of a right child
+        i_smallest = i
+        if l < n and key[A[l]] < key[A[i_smallest]]:
+            i_smallest = l
+        if r < n and key[A[r]] < key[A[i_smallest]]:
+            i_smallest = r
+        if i_smallest == i:
+            return
+        A[i], A[i_smallest] = A[i_smallest], A[i]
+        pos[A[i]], pos[A[i_smallest]] = i, i_smallest
+        i = i_smallest  # Repeat one level down
+
+
+def indexed_heap_bubble_up(H, i):
+    """Causes the element at a given index to "bubble up" to its position in the min-heap.
+
+    Complexity:
+        :math:`O(\log n)`.
+
+    :param IndexedHeap H: Indexed heap.
+    :param int i: Integer index of an element to bubble up.
+
+    """
+    A, key, pos = H.A, H.key, H.pos
+    while i > 0:
+        p = (i - 1) // 2  # Parent's index
+        if not key[A[i]] < key[A[p]]:
+            return
+        A[p], A[i] = A[i], A[p]  # Exchange child with parent
+        pos[A[p]], pos[A[i]] = p, i
+        i = p  # Repeat one level up
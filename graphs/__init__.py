@@ -34,6 +34,7 @@ class Graph:
         """
         self.map = {}  # Map of vertices, keyed by their key
         self.V = []  # Vertices as list
+        self.r_edges = None  # Reverse edges index, built on demand
 
     def Adj(self, v):
         """Iterates through adjacent vertices of a vertex.
@@ -46,6 +47,21 @@ class Graph:
         for k in v.f_edges:
             yield self.map[k]
 
+    def RAdj(self, v):
+        """Iterates through vertices that have an edge pointing to a vertex.
+
+        Reverse edges index is built on the first call with :func:`build_reverse_edges()`
+        and is cached on the graph.
+
+        :param Vertex v: Target vertex.
+        :return: Next preceding vertex in an arbitrary order.
+
+        """
+        if self.r_edges is None:
+            build_reverse_edges(self)
+        for k in self.r_edges.get(v.key, ()):
+            yield self.map[k]
+
     def E(self):
         """Iterates through all edges in a graph as tuples of vertices.
 
@@ -64,6 +80,7 @@ class Edge:
 
     Points to source vertex, target vertex and has an optional weight value.
     """
+    __slots__ = ("u", "v", "weight")
 
     def __init__(self, u, v, w=None):
         """Edge of a graph.
@@ -105,6 +122,99 @@ def degree(v):
     return len(v.f_edges)
 
 
+def in_degree(G, v):
+    """Returns in-degree of a vertex.
+
+    In-degree of a vertex is the number of edges that point to the vertex. Reverse edges
+    index is built on the first call with :func:`build_reverse_edges()`.
+
+    Complexity:
+        :math:`O(1)`, :math:`O(V+E)` for the first call.
+
+    :param Graph G: Subject graph.
+    :param Vertex v: Subject vertex.
+    :return: In-degree of a vertex.
+
+    """
+    if G.r_edges is None:
+        build_reverse_edges(G)
+    return len(G.r_edges.get(v.key, ()))
+
+
+def add_edge(G, u, v, w=None):
+    """Adds an edge to a graph, or replaces an existing edge between the same vertices.
+
+    Reverse edges index is updated if it was built.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param Graph G: Subject graph.
+    :param Vertex u: Source vertex.
+    :param Vertex v: Target vertex.
+    :param float w: (optional) Weight of an edge.
+    :return: New :class:`Edge` object.
+
+    """
+    e = Edge(u, v, w)
+    u.f_edges[v.key] = e
+    if G.r_edges is not None:
+        G.r_edges.setdefault(v.key, {})[u.key] = e
+    return e
+
+
+def remove_edge(G, u, v):
+    """Removes an edge from a graph.
+
+    Reverse edges index is updated if it was built.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param Graph G: Subject graph.
+    :param Vertex u: Source vertex.
+    :param Vertex v: Target vertex.
+
+    """
+    del u.f_edges[v.key]
+    if G.r_edges is not None:
+        del G.r_edges[v.key][u.key]
+
+
+def build_reverse_edges(G):
+    """Builds reverse edges index of a graph.
+
+    For every vertex the index maps keys of preceding vertices to the same :class:`Edge`
+    objects that are stored as their forward edges. Index is saved as :data:`G.r_edges`.
+    It is kept up to date by :func:`add_edge()` and :func:`remove_edge()`. If forward
+    edges are modified directly, the index must be dropped with
+    :func:`invalidate_reverse_edges()`, so that it is rebuilt on the next use.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param Graph G: Subject graph.
+
+    """
+    R = {k: {} for k in G.map}
+    for u in G.V:
+        for k, e in u.f_edges.items():
+            R[k][u.key] = e
+    G.r_edges = R
+
+
+def invalidate_reverse_edges(G):
+    """Drops reverse edges index of a graph.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param Graph G: Subject graph.
+
+    """
+    G.r_edges = None
+
+
 def potential(x):
     """Returns a potential of a vertex.
 
@@ -139,7 +249,14 @@ def weight(u, v):
 
 class Vertex:
     """Basic graph node with attributes.
+
+    Attributes are declared in slots instead of an instance dictionary, which makes a
+    vertex several times smaller and speeds up attribute access. Slots cover the key,
+    potential and edges of a vertex, and the attributes written by graph algorithms: color,
+    distance or discovery time ``d``, parent ``p`` and finishing time ``f``. Other
+    attributes cannot be assigned.
     """
+    __slots__ = ("key", "pt", "f_edges", "color", "d", "p", "f")
 
     def __init__(self, k):
         """Basic graph node with attributes.
@@ -198,6 +315,91 @@ def dict_to_graph(D):
     return G
 
 
+def edges_to_graph(E, dedup="last", G=None):
+    """Builds a graph out of a stream of edges.
+
+    Edges are given as tuples of vertex keys ``(u, v)`` for unweighted graphs or
+    ``(u, v, w)`` for weighted graphs, and can come from any iterable, such as a generator
+    or :func:`read_edges()`. Every edge is added to the graph as soon as it is consumed,
+    so unlike :func:`dict_to_graph()` no intermediate representation of the whole graph is
+    kept in memory. Vertices are created in order of their first appearance, which makes
+    their positions in :data:`G.V` dense integer ids. Keys are interned: edges refer to the
+    key object held by a vertex, so that equal keys parsed from a file are stored once.
+
+    Graph does not hold parallel edges, and they are resolved with a dedup policy:
+     - ``"last"`` keeps the last edge, like :func:`dict_to_graph()` does
+     - ``"first"`` keeps the first edge
+     - ``"min"`` and ``"max"`` keep the edge with the smallest or the largest weight, and
+       raise :class:`ValueError` on a parallel unweighted edge
+     - ``"error"`` raises :class:`ValueError`
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param iterable E: Edge tuples.
+    :param str dedup: (optional) Policy for parallel edges.
+    :param Graph G: (optional) Graph to add edges to, which allows to build a graph chunk
+     by chunk. New graph is created by default.
+    :return: Output :data:`Graph` object.
+
+    """
+    if dedup not in ("last", "first", "min", "max", "error"):
+        raise ValueError("Unknown dedup policy")
+    if G is None:
+        G = Graph()
+    M = G.map
+    for e in E:
+        for k in e[:2]:
+            if k not in M:  # Creating a pointer for a new vertex
+                x = Vertex(k)
+                M[k] = x
+                G.V.append(x)
+        u, v = M[e[0]], M[e[1]]
+        w = e[2] if len(e) > 2 else None
+        f = u.f_edges.get(v.key)
+        if f is not None:  # Parallel edge
+            if dedup == "error":
+                raise ValueError("Parallel edge " + str(f))
+            if (dedup == "min" or dedup == "max") and (w is None or f.weight is None):
+                raise ValueError("Unweighted parallel edge " + str(f))
+            if dedup == "first" or dedup == "min" and not w < f.weight \
+                    or dedup == "max" and not w > f.weight:
+                continue
+        add_edge(G, u, v, w)
+    return G
+
+
+def read_edges(f, key=str, sep=None, chunk_size=1 << 16):
+    """Reads an edge list from a text file.
+
+    Every line holds a source key, a target key and an optional weight. Empty lines and
+    lines starting with ``#`` are skipped. File is read in chunks of lines of roughly the
+    given size, and edges are yielded one by one, so that a graph of any size can be
+    passed to :func:`edges_to_graph()` while only a single chunk is held in memory.
+
+    :param file f: Input text file.
+    :param callable key: (optional) Function that converts a field into a vertex key.
+    :param str sep: (optional) Field separator, whitespace by default.
+    :param int chunk_size: (optional) Number of characters in a chunk.
+    :return: Next edge tuple ``(u, v)`` or ``(u, v, w)``.
+
+    """
+    while True:
+        L = f.readlines(chunk_size)
+        if len(L) == 0:
+            break
+        for line in L:
+            P = [x.strip() for x in line.split(sep)]
+            if all(len(x) == 0 for x in P) or P[0].startswith("#"):
+                continue
+            if len(P) == 2:
+                yield key(P[0]), key(P[1])
+            elif len(P) == 3:
+                yield key(P[0]), key(P[1]), float(P[2])
+            else:
+                raise ValueError("Malformed edge: " + line.strip())
+
+
 class Counter:
     """Simple mutable ticker.
     """
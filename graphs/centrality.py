@@ -0,0 +1,325 @@
+"""
+Link Analysis and Centrality
+============================
+
+Centrality measures assign every vertex of a graph a score of its importance.
+**Degree centrality** simply counts the edges of a vertex. **Closeness centrality** is
+the inverse of the average distance from all the other vertices, so that a vertex that
+can be reached quickly from everywhere has a high score.
+
+**PageRank** models a random surfer, who follows a random outgoing edge of the current
+vertex with probability :math:`\\alpha` (the *damping factor*), and jumps to a random vertex
+with probability :math:`1-\\alpha`. Rank of a vertex is the probability of finding the
+surfer there in the long run. Ranks are the fixed point of
+
+.. math::
+    x = \\alpha P^T x + (\\alpha\\delta + 1 - \\alpha) p
+
+where :math:`P` is the transition matrix of the random walk, :math:`p` is the jump
+distribution and :math:`\\delta` is the rank held by *dangling* vertices that have no
+outgoing edges, whose surfer jumps with certainty. **Personalized PageRank** jumps back
+to a given set of vertices instead of a random vertex, and ranks vertices by their
+proximity to that set.
+
+The fixed point is found with power iteration, and the only costly step of an iteration
+is a sparse matrix-vector product over a CSR graph. Pure Python has no vector
+instructions, so the product is evaluated with built-in iterators chained over the flat
+edge arrays, which moves the inner loop over the edges out of the interpreter. Rows of
+the product are independent and can be split between the processes of a pool.
+"""
+import os
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+from operator import mul, sub
+
+from graphs import Graph, Vertex, degree, in_degree
+from graphs.csr import CSRGraph, graph_to_csr, csr_transpose, csr_bfs, csr_dijkstra
+
+
+def pagerank(G, alpha=0.85, tol=1e-6, max_iter=100, executor=None, k=None):
+    """Computes PageRank of every vertex of a graph.
+
+    Edge weights, if present, make the surfer follow an edge with a probability
+    proportional to its weight.
+
+    Complexity:
+        :math:`O(V+E)` per iteration.
+
+    :param Graph G: Directed graph.
+    :param float alpha: (optional) Damping factor.
+    :param float tol: (optional) Convergence tolerance per vertex.
+    :param int max_iter: (optional) Maximum number of iterations.
+    :param concurrent.futures.ProcessPoolExecutor executor: (optional) Executor to run
+     matrix-vector products on.
+    :param int k: (optional) Number of row partitions. Defaults to the number of processors.
+    :return: Dictionary of ranks keyed by vertex key.
+
+    """
+    x = csr_pagerank(graph_to_csr(G), alpha, tol, max_iter, None, executor, k)
+    return {v.key: x[i] for i, v in enumerate(G.V)}
+
+
+def personalized_pagerank(G, S, alpha=0.85, tol=1e-6, max_iter=100, executor=None, k=None):
+    """Computes PageRank of every vertex of a graph, personalized to a set of vertices.
+
+    :param Graph G: Directed graph.
+    :param dict S: Jump weights keyed by vertex key. Weights are normalized to a
+     probability distribution. Any other collection of keys gives equal weights.
+    :param float alpha: (optional) Damping factor.
+    :param float tol: (optional) Convergence tolerance per vertex.
+    :param int max_iter: (optional) Maximum number of iterations.
+    :param concurrent.futures.ProcessPoolExecutor executor: (optional) Executor to run
+     matrix-vector products on.
+    :param int k: (optional) Number of row partitions. Defaults to the number of processors.
+    :return: Dictionary of ranks keyed by vertex key.
+
+    """
+    if not isinstance(S, dict):
+        S = dict.fromkeys(S, 1.0)
+    p = array('d', [S.get(v.key, 0.0) for v in G.V])
+    total = sum(p)
+    if total <= 0:
+        raise ValueError("Empty personalization")
+    p = array('d', [w / total for w in p])
+    x = csr_pagerank(graph_to_csr(G), alpha, tol, max_iter, p, executor, k)
+    return {v.key: x[i] for i, v in enumerate(G.V)}
+
+
+def csr_pagerank(C, alpha=0.85, tol=1e-6, max_iter=100, p=None, executor=None, k=None):
+    """PageRank power iteration on a CSR graph.
+
+    Transposed transition matrix :math:`P^T` is built once by :func:`transition_matrix()`.
+    Every iteration multiplies it by the current ranks with :func:`spmv()`, adds the
+    jump probabilities, and stops once the :math:`L_1` distance between the consecutive
+    rank vectors drops below :math:`n \\cdot tol`, or after the maximum number of
+    iterations.
+
+    With an executor, the matrix and the rank vector are placed in
+    :mod:`multiprocessing.shared_memory` once, like in :func:`graphs.mst.boruvka()`. Rows
+    are split into partitions with about the same number of edges, and every worker
+    returns only its slice of the product. The calling process writes the new ranks back
+    into shared memory between the iterations.
+
+    Complexity:
+        :math:`O(V+E)` per iteration, :math:`O((V+E)/k)` per worker.
+
+    :param CSRGraph C: Directed graph.
+    :param float alpha: (optional) Damping factor.
+    :param float tol: (optional) Convergence tolerance per vertex.
+    :param int max_iter: (optional) Maximum number of iterations.
+    :param array p: (optional) Jump distribution indexed by vertex id. Uniform by default.
+    :param concurrent.futures.ProcessPoolExecutor executor: (optional) Executor to run
+     matrix-vector products on.
+    :param int k: (optional) Number of row partitions. Defaults to the number of processors.
+    :return: Array of ranks indexed by vertex id.
+
+    """
+    n = C.n
+    if n == 0:
+        return array('d')
+    if p is None:
+        p = array('d', [1.0 / n]) * n
+    P = transition_matrix(C)
+    O, T, W = P.offsets, P.targets, P.weights
+    m = len(T)
+    D = [u for u in range(n) if C.offsets[u] == C.offsets[u + 1]]  # Dangling vertices
+    k = k or os.cpu_count() or 1
+    B = [bisect_left(O, m * j // k, 0, n) for j in range(k)] + [n]  # Row partitions
+    M, X = None, None  # Shared memory blocks and the shared rank vector
+    try:
+        if executor is None:
+            x = array('d', p)
+        else:
+            M = [SharedMemory(create=True, size=max(1, 8 * x)) for x in (n + 1, m, m, n)]
+            for b, Y, t in zip(M, (O, T, W, p), ('q', 'q', 'd', 'd')):
+                b.buf[:8 * len(Y)] = array(t, Y).tobytes()
+            X = M[3].buf[:8 * n].cast('d')
+            names = [b.name for b in M]
+            x = X
+        for _ in range(max_iter):
+            if executor is None:
+                y = spmv(O, T, W, x, 0, n)
+            else:
+                y = array('d')
+                for r in executor.map(shared_spmv, [names] * k, [n] * k, [m] * k,
+                                      B[:-1], B[1:]):
+                    y.extend(r)
+            c = alpha * sum(map(x.__getitem__, D)) + 1.0 - alpha
+            y = array('d', [alpha * a + c * b for a, b in zip(y, p)])
+            err = sum(map(abs, map(sub, y, x)))
+            if executor is None:
+                x = y
+            else:
+                X[:] = y
+            if err < n * tol:
+                break
+        return array('d', x)
+    finally:
+        if M is not None:
+            if X is not None:
+                X.release()
+            for b in M:
+                b.close()
+                b.unlink()
+
+
+def degree_centrality(G, reverse=False):
+    """Computes degree centrality of every vertex of a graph.
+
+    Degree of a vertex is normalized by the largest possible degree :math:`n-1`.
+
+    Complexity:
+        :math:`O(V)`, :math:`O(V+E)` if reverse edges index is not built.
+
+    :param Graph G: A graph.
+    :param bool reverse: (optional) Count incoming edges instead of outgoing edges.
+    :return: Dictionary of centralities keyed by vertex key.
+
+    """
+    s = 1.0 / (len(G.V) - 1) if len(G.V) > 1 else 1.0
+    if reverse:
+        return {v.key: in_degree(G, v) * s for v in G.V}
+    return {v.key: degree(v) * s for v in G.V}
+
+
+def closeness_centrality(G, executor=None, k=None):
+    """Computes closeness centrality of every vertex of a graph.
+
+    Closeness of a vertex :math:`u` that is reachable from :math:`r-1` other vertices is
+
+    .. math::
+        \\frac{r-1}{\\sum_v d(v, u)} \\cdot \\frac{r-1}{n-1}
+
+    where the second factor, due to Wasserman and Faust, scales down the vertices that
+    are reachable only from a small part of the graph. Distances are measured along
+    incoming edges, with a single-source search per vertex on the transposed graph:
+    :func:`graphs.csr.csr_bfs()`, or :func:`graphs.csr.csr_dijkstra()` if the graph is
+    weighted. Searches are independent and can be split between the workers of an
+    executor, like in :func:`graphs.search.grid_distance_sum()`.
+
+    Complexity:
+        :math:`O(V(V+E))` for unweighted graphs, :math:`O(VE\\log E)` for weighted graphs,
+        divided between the workers.
+
+    :param Graph G: A graph.
+    :param concurrent.futures.Executor executor: (optional) Executor to run the searches on.
+    :param int k: (optional) Number of groups the vertices are split into for the
+     executor. Defaults to the number of processors.
+    :return: Dictionary of centralities keyed by vertex key.
+
+    """
+    R = csr_transpose(graph_to_csr(G))
+    n = R.n
+    if executor is None:
+        c = closeness_chunk(R, range(n))
+    else:
+        k = k or os.cpu_count() or 1
+        c = array('d', [0.0]) * n
+        for j, r in enumerate(executor.map(closeness_chunk, [R] * k,
+                                           [range(j, n, k) for j in range(k)])):
+            c[j::k] = r
+    return {v.key: c[i] for i, v in enumerate(G.V)}
+
+
+"""
+Subroutines used in link analysis and centrality
+"""
+
+
+def transition_matrix(C):
+    """Builds a transposed transition matrix of a random walk on a CSR graph.
+
+    Row :math:`v` of the matrix lists incoming edges :math:`(u, v)` with the probability
+    of following the edge from :math:`u`, which is its weight divided by the total weight
+    of the outgoing edges of :math:`u`, or :math:`1/deg(u)` for unweighted graphs.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: Directed graph.
+    :return: Transposed transition matrix as :data:`CSRGraph`.
+
+    """
+    n, O, W = C.n, C.offsets, C.weights
+    s = array('d', [0.0]) * n  # Inverse totals of outgoing weights
+    for u in range(n):
+        t = O[u + 1] - O[u] if W is None else sum(W[O[u]:O[u + 1]])
+        if t > 0:
+            s[u] = 1.0 / t
+    R = csr_transpose(C)
+    w = map(s.__getitem__, R.targets)
+    weights = array('d', w if W is None else map(mul, R.weights, w))
+    return CSRGraph(R.keys, R.offsets, R.targets, weights)
+
+
+def spmv(O, T, W, x, lo, hi):
+    """Multiplies a range of rows of a sparse matrix by a vector.
+
+    Products of all the entries of the range are generated by a single chain of
+    :func:`map` calls over the edge arrays, and are summed up row by row with
+    :func:`itertools.islice`, so that the interpreter only loops over the rows.
+
+    Complexity:
+        :math:`O(k+e)` where :math:`k` is the number of rows and :math:`e` is the number of
+        entries in the rows.
+
+    :param array O: Row offsets of a matrix in CSR format.
+    :param array T: Column indices of entries.
+    :param array W: Values of entries.
+    :param array x: Input vector.
+    :param int lo: First row of a range.
+    :param int hi: Row past the end of a range.
+    :return: Array of products indexed by row, starting at :math:`lo`.
+
+    """
+    a, b = O[lo], O[hi]
+    it = map(mul, W[a:b], map(x.__getitem__, T[a:b]))
+    return array('d', [sum(islice(it, O[v + 1] - O[v])) for v in range(lo, hi)])
+
+
+def shared_spmv(names, n, m, lo, hi):
+    """Runs :func:`spmv()` over the arrays placed in shared memory.
+
+    :param list[str] names: Names of shared memory blocks holding row offsets, column
+     indices, values of a matrix, and an input vector.
+    :param int n: Number of rows.
+    :param int m: Number of entries.
+    :param int lo: First row of a range.
+    :param int hi: Row past the end of a range.
+    :return: Array of products indexed by row, starting at :math:`lo`.
+
+    """
+    M = [SharedMemory(name=x) for x in names]
+    X = [b.buf[:8 * x].cast(t) for b, x, t in zip(M, (n + 1, m, m, n), ('q', 'q', 'd', 'd'))]
+    try:
+        return spmv(X[0], X[1], X[2], X[3], lo, hi)
+    finally:
+        for x in X:
+            x.release()
+        for b in M:
+            b.close()
+
+
+def closeness_chunk(R, S):
+    """Computes closeness centrality of a group of vertices.
+
+    :param CSRGraph R: Transposed graph.
+    :param iterable S: Vertex ids.
+    :return: Array of centralities in order of vertex ids.
+
+    """
+    n = R.n
+    out = array('d')
+    for u in S:
+        if R.weights is None:
+            d = [x for x in csr_bfs(R, u)[0] if x >= 0]
+        else:
+            d = [x for x in csr_dijkstra(R, u)[0] if x < inf]
+        r, total = len(d) - 1, sum(d)  # Number of other reachable vertices
+        out.append(r * r / (total * (n - 1)) if total > 0 else 0.0)
+    return out
+
+
+inf = float("inf")
@@ -0,0 +1,189 @@
+"""
+Strongly Connected Components
+=============================
+
+A **strongly connected component** of a directed graph is a maximal set of vertices in
+which every vertex is reachable from every other vertex. Every vertex belongs to exactly
+one component, and a DAG is a graph where every component consists of a single vertex.
+
+Contracting every component into a single vertex gives a **condensation** of a graph.
+Condensation is always a DAG: if two components could reach each other, they would form
+a single component. This allows algorithms that require a DAG, such as
+:func:`graphs.topological_sort.topological_sort()` or
+:func:`graphs.shortest_paths.dag_shortest_paths()`, to run on graphs with cycles, for
+example to schedule cyclic dependencies as a group.
+"""
+from array import array
+
+from graphs import Graph, Vertex, dict_to_graph
+from graphs.csr import CSRGraph, graph_to_csr
+
+
+def csr_scc(C):
+    """Tarjan's strongly connected components algorithm on a CSR graph.
+
+    Tarjan's algorithm is a single depth-first search. Every vertex gets a discovery index
+    and a **low-link** value: the smallest index of a vertex on the stack reachable from
+    its DFS subtree, including through one back edge. Visited vertices are kept on a
+    separate stack until their component is complete. A vertex whose low-link equals its
+    own index is the root of a component, and the component consists of the vertices above
+    it on the stack.
+
+    Recursion is replaced with an explicit call stack and an array of next unexplored edge
+    positions, like in :func:`graphs.csr.csr_dfs()`, so that the algorithm runs on graphs
+    with millions of vertices.
+
+    Tarjan's algorithm completes components in reverse topological order of the
+    condensation. Component ids are numbered backwards, so that every edge of the
+    condensation leads from a smaller id to a larger id.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: Directed graph.
+    :return: Tuple of the number of components and an array of component ids indexed by
+     vertex id.
+
+    """
+    n, O, T = C.n, C.offsets, C.targets
+    index = array('q', [-1]) * n  # Discovery indices
+    low = array('q', [0]) * n  # Low-link values
+    comp = array('q', [-1]) * n
+    nxt = array('q', O[:n])  # Next unexplored edge of every vertex
+    on_stack = bytearray(n)
+    S = array('q')  # Vertices of incomplete components
+    P = array('q')  # Call stack
+    t, k = 0, 0
+    for r in range(n):
+        if index[r] != -1:
+            continue
+        index[r] = low[r] = t
+        t += 1
+        S.append(r)
+        on_stack[r] = 1
+        P.append(r)
+        while len(P) > 0:
+            u = P[-1]
+            i = nxt[u]
+            if i < O[u + 1]:
+                nxt[u] = i + 1
+                v = T[i]
+                if index[v] == -1:  # Tree edge, descend
+                    index[v] = low[v] = t
+                    t += 1
+                    S.append(v)
+                    on_stack[v] = 1
+                    P.append(v)
+                elif on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                P.pop()  # Vertex `u` is finished
+                if len(P) > 0 and low[u] < low[P[-1]]:
+                    low[P[-1]] = low[u]
+                if low[u] == index[u]:  # `u` is a root of a component
+                    while True:
+                        x = S.pop()
+                        on_stack[x] = 0
+                        comp[x] = k
+                        if x == u:
+                            break
+                    k += 1
+    for u in range(n):
+        comp[u] = k - 1 - comp[u]  # Number components in topological order
+    return k, comp
+
+
+def csr_condensation(C, k, comp):
+    """Builds a condensation of a CSR graph.
+
+    Vertices are grouped by component with a counting sort. Edges of each component are
+    then collected with a marker array that remembers the position of the last edge to
+    every target component, so that parallel edges are merged without hashing. Merged edge
+    keeps the minimal weight, and edges within a component are dropped.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: Directed graph.
+    :param int k: Number of components.
+    :param array comp: Component ids indexed by vertex id, see :func:`csr_scc()`.
+    :return: Condensation DAG as :data:`CSRGraph`, with component ids as vertex keys.
+
+    """
+    n, O, T, W = C.n, C.offsets, C.targets, C.weights
+    start = array('q', [0]) * (k + 1)  # Offsets of component members
+    for u in range(n):
+        start[comp[u] + 1] += 1
+    for c in range(k):
+        start[c + 1] += start[c]
+    nxt = array('q', start[:k])
+    members = array('q', [0]) * n
+    for u in range(n):
+        members[nxt[comp[u]]] = u
+        nxt[comp[u]] += 1
+    mark = array('q', [-1]) * k  # Edge position of the last edge to a component
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d') if W is not None else None
+    for c in range(k):
+        first = len(targets)  # Position of the first edge of the component
+        for j in range(start[c], start[c + 1]):
+            u = members[j]
+            for i in range(O[u], O[u + 1]):
+                d = comp[T[i]]
+                if d == c:
+                    continue
+                e = mark[d]
+                if e < first:  # First edge between the two components
+                    mark[d] = len(targets)
+                    targets.append(d)
+                    if W is not None:
+                        weights.append(W[i])
+                elif W is not None and W[i] < weights[e]:
+                    weights[e] = W[i]
+        offsets.append(len(targets))
+    return CSRGraph(list(range(k)), offsets, targets, weights)
+
+
+def scc(G):
+    """Finds strongly connected components of a graph.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param Graph G: Directed graph.
+    :return: List of components as lists of vertices, in topological order of the
+     condensation.
+
+    """
+    k, comp = csr_scc(graph_to_csr(G))
+    out = [[] for _ in range(k)]
+    for i, v in enumerate(G.V):
+        out[comp[i]].append(v)
+    return out
+
+
+def condensation(G):
+    """Builds a condensation of a graph.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param Graph G: Directed graph.
+    :return: Tuple of a condensation DAG as :data:`Graph`, whose vertex keys are component
+     ids, and a list of components as lists of vertices indexed by component id.
+
+    """
+    C = graph_to_csr(G)
+    k, comp = csr_scc(C)
+    H = csr_condensation(C, k, comp)
+    out = [[] for _ in range(k)]
+    for i, v in enumerate(G.V):
+        out[comp[i]].append(v)
+    D = {}
+    for c in range(k):
+        if H.weights is None:
+            D[c] = [H.targets[i] for i in range(H.offsets[c], H.offsets[c + 1])]
+        else:
+            D[c] = {H.targets[i]: H.weights[i] for i in range(H.offsets[c], H.offsets[c + 1])}
+    return dict_to_graph(D), out
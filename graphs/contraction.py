@@ -0,0 +1,355 @@
+"""
+Contraction Hierarchies
+=======================
+
+Contraction hierarchies speed up repeated shortest-path queries on a static weighted graph
+by moving most of the work into a preprocessing stage.
+
+During preprocessing the vertices are **contracted** one by one in order of their
+importance. Contracting a vertex :math:`v` removes it from the remaining graph. For every
+pair of its remaining neighbours :math:`u \\to v \\to x` a **shortcut** edge
+:math:`(u, x)` of weight :math:`w(u, v) + w(v, x)` is added, unless a *witness* path from
+:math:`u` to :math:`x` that avoids :math:`v` and is not longer exists. Order in which the
+vertices were contracted is called their **rank**.
+
+Original edges and shortcuts are then split into the **upward graph** of edges leading to
+vertices of a higher rank and the **downward graph** of edges leading to vertices of a
+lower rank. Every shortest path in the original graph has a counterpart in the hierarchy
+that first goes only up and then goes only down. Thus a query is a bidirectional Dijkstra
+search, where the forward search from the source only uses the upward graph and the
+backward search from the target only uses the reversed downward graph. Both searches
+settle just a few hundred vertices even on very large road networks.
+
+Shortcuts remember the contracted vertex they bypass, so that the path found in a
+hierarchy can be unpacked into a path of original edges.
+"""
+import os
+import struct
+from array import array
+from heapq import heappush, heappop
+
+from graphs import Graph, Vertex, weight
+from graphs.csr import CSRGraph, edges_to_csr, csr_save, csr_load
+from graphs.csr import as_array, write_section, read_section
+
+
+class ContractionHierarchy:
+    """Preprocessed contraction hierarchy of a weighted graph.
+
+    Holds the upward graph and the reversed downward graph as CSR graphs over dense vertex
+    ids, ranks of vertices and contracted vertices of all shortcuts. Hierarchy does not
+    reference the original graph, so it can be saved and loaded on its own.
+    """
+
+    def __init__(self, keys, rank, up, down, shortcuts):
+        """Preprocessed contraction hierarchy of a weighted graph.
+
+        :param list keys: Vertex keys indexed by vertex id.
+        :param list rank: Ranks of vertices indexed by vertex id.
+        :param CSRGraph up: Edges leading to vertices of a higher rank.
+        :param CSRGraph down: Reversed edges leading to vertices of a lower rank.
+        :param dict shortcuts: Contracted vertex ids keyed by shortcut tuples.
+
+        """
+        self.keys = keys
+        self.index = {k: i for i, k in enumerate(keys)}  # Vertex ids keyed by vertex key
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.shortcuts = shortcuts
+
+
+def contract(G, witness_limit=500):
+    """Builds a contraction hierarchy of a weighted directed graph.
+
+    Vertices are ordered by a priority that combines **edge difference** (the number of
+    shortcuts a contraction would add minus the number of edges it would remove) with the
+    number of already contracted neighbours, which spreads contractions evenly across the
+    graph. Priorities change as the graph is contracted, so they are updated lazily: the
+    vertex on the top of the queue is re-evaluated and only contracted if it still has the
+    lowest priority.
+
+    Witness searches are bounded by the number of settled vertices. If a witness is not
+    found within the limit, an unnecessary shortcut may be added, which does not affect
+    correctness of the queries.
+
+    Complexity:
+        Depends on the structure of a graph. Each contraction runs a local Dijkstra search
+        for every incoming edge of a vertex, limited to :math:`l` settled vertices.
+
+    :param Graph G: Weighted directed graph with non-negative weights.
+    :param int witness_limit: Maximum number of vertices settled by a witness search.
+    :return: :data:`ContractionHierarchy` object.
+
+    """
+    keys = [v.key for v in G.V]
+    index = {k: i for i, k in enumerate(keys)}
+    n = len(keys)
+    out_ = [{} for _ in range(n)]  # Remaining forward edges
+    in_ = [{} for _ in range(n)]  # Remaining reverse edges
+    for u in G.V:
+        i = index[u.key]
+        for k in u.f_edges:
+            j = index[k]
+            if i != j:
+                w = weight(u, G.map[k])
+                if w < out_[i].get(j, inf):
+                    out_[i][j] = w
+                    in_[j][i] = w
+    rank = [-1] * n
+    deleted = [0] * n  # Number of contracted neighbours
+    shortcuts = {}
+    up, down = [], []  # Edges of the upward and the reversed downward graphs
+    Q = []
+    for v in range(n):
+        S = witness_shortcuts(out_, in_, v, witness_limit)
+        heappush(Q, (priority(out_, in_, deleted, v, S), v))
+    r = 0
+    while len(Q) > 0:
+        _, v = heappop(Q)
+        S = witness_shortcuts(out_, in_, v, witness_limit)
+        p = priority(out_, in_, deleted, v, S)
+        if len(Q) > 0 and p > Q[0][0]:
+            heappush(Q, (p, v))  # Priority went up, re-queue the vertex
+            continue
+        rank[v] = r
+        r += 1
+        for x, w in out_[v].items():
+            up.append((v, x, w))
+        for u, w in in_[v].items():
+            down.append((v, u, w))
+        for u, x, w in S:
+            out_[u][x] = w
+            in_[x][u] = w
+            shortcuts[(u, x)] = v
+        for x in out_[v]:  # Remove `v` from the remaining graph
+            del in_[x][v]
+            deleted[x] += 1
+        for u in in_[v]:
+            del out_[u][v]
+            deleted[u] += 1
+        out_[v], in_[v] = {}, {}
+    ids = range(n)
+    return ContractionHierarchy(keys, rank, edges_to_csr(up, ids), edges_to_csr(down, ids),
+                                shortcuts)
+
+
+def ch_query(H, s, t):
+    """Answers a shortest-path query using a contraction hierarchy.
+
+    Runs forward search on the upward graph from :math:`s` and backward search on the
+    reversed downward graph from :math:`t`. A search stops once its smallest estimate is
+    not less than the best path weight :math:`\\mu` found so far. Vertex on which both
+    searches meet with a minimal total weight is the highest ranked vertex of the path.
+
+    Complexity:
+        :math:`O(k \\log k)` where :math:`k` is the number of edges scanned by both
+        searches, which is typically much smaller than the size of the graph.
+
+    :param ContractionHierarchy H: Contraction hierarchy.
+    :param object s: Key of a starting vertex.
+    :param object t: Key of a target vertex.
+    :return: Tuple of the shortest path weight and the list of vertex keys on the path, or
+     of infinity and :data:`None` if there is no path.
+
+    """
+    s, t = H.index[s], H.index[t]
+    D = ({s: 0}, {t: 0})  # Estimates of the forward and the backward searches
+    P = ({s: -1}, {t: -1})  # Predecessors of the forward and the backward searches
+    Q = ([(0, s)], [(0, t)])
+    C = (H.up, H.down)
+    mu, x = inf, -1
+    if s == t:
+        mu, x = 0, s
+    k = 0  # Direction of a search
+    while len(Q[0]) > 0 or len(Q[1]) > 0:
+        if len(Q[k]) == 0:
+            k = 1 - k
+        d, p, q, c, o = D[k], P[k], Q[k], C[k], D[1 - k]
+        du, u = heappop(q)
+        if du >= mu:
+            q.clear()  # Search in this direction cannot improve the path
+        elif du == d[u]:
+            if u in o and du + o[u] < mu:
+                mu, x = du + o[u], u
+            O, T, W = c.offsets, c.targets, c.weights
+            for i in range(O[u], O[u + 1]):
+                v = T[i]
+                dv = du + W[i]
+                if dv < d.get(v, inf):
+                    d[v] = dv
+                    p[v] = u
+                    heappush(q, (dv, v))
+        k = 1 - k
+    if x == -1:
+        return inf, None
+    L = []  # Path in a hierarchy
+    u = x
+    while u != -1:
+        L.append(u)
+        u = P[0][u]
+    L.reverse()
+    u = P[1][x]
+    while u != -1:
+        L.append(u)
+        u = P[1][u]
+    return mu, [H.keys[u] for u in unpack_path(H, L)]
+
+
+def ch_save(H, path):
+    """Saves a contraction hierarchy to a directory.
+
+    The upward and the downward graphs are written with :func:`graphs.csr.csr_save()`, and
+    the upward graph file also holds the vertex keys, so the same restrictions on key types
+    apply. Ranks of vertices and the shortcut table are written to a separate file as flat
+    arrays of 64-bit integers: ranks, and then sources, targets and contracted vertices of
+    all shortcuts. No executable data is stored, so a hierarchy from an untrusted source
+    can be loaded safely.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param ContractionHierarchy H: Contraction hierarchy.
+    :param str path: Output directory path, created if it does not exist.
+
+    """
+    os.makedirs(path, exist_ok=True)
+    up = CSRGraph(H.keys, H.up.offsets, H.up.targets, H.up.weights)
+    csr_save(up, os.path.join(path, UP_FILE))
+    csr_save(H.down, os.path.join(path, DOWN_FILE))
+    n, k = len(H.rank), len(H.shortcuts)
+    with open(os.path.join(path, RANK_FILE), "wb") as f:
+        f.write(struct.pack(CH_HEADER, CH_MAGIC, n, k))
+        write_section(f, as_array('q', H.rank))
+        write_section(f, array('q', (u for u, _ in H.shortcuts)))
+        write_section(f, array('q', (x for _, x in H.shortcuts)))
+        write_section(f, array('q', H.shortcuts.values()))
+
+
+def ch_load(path):
+    """Loads a contraction hierarchy from a directory.
+
+    Both graphs are memory-mapped with :func:`graphs.csr.csr_load()`. Vertex keys, ranks
+    and the shortcut table are read into memory.
+
+    Complexity:
+        :math:`O(V+S)` where :math:`S` is the number of shortcuts.
+
+    :param str path: Input directory path written by :func:`ch_save()`.
+    :return: :data:`ContractionHierarchy` object.
+
+    """
+    up = csr_load(os.path.join(path, UP_FILE))
+    down = csr_load(os.path.join(path, DOWN_FILE))
+    with open(os.path.join(path, RANK_FILE), "rb") as f:
+        M = memoryview(f.read())
+    if len(M) < struct.calcsize(CH_HEADER):
+        raise ValueError("Not a contraction hierarchy")
+    magic, n, k = struct.unpack_from(CH_HEADER, M)
+    if magic != CH_MAGIC or n != up.n or n != down.n:
+        raise ValueError("Not a contraction hierarchy")
+    i = struct.calcsize(CH_HEADER)
+    rank, i = read_section(M, i, 'q', n)
+    U, i = read_section(M, i, 'q', k)
+    X, i = read_section(M, i, 'q', k)
+    V, i = read_section(M, i, 'q', k)
+    ids = range(n)
+    return ContractionHierarchy(list(up.keys), list(rank),
+                                CSRGraph(ids, up.offsets, up.targets, up.weights),
+                                CSRGraph(ids, down.offsets, down.targets, down.weights),
+                                {(u, x): v for u, x, v in zip(U, X, V)})
+
+
+"""
+Constants and subroutines used in contraction hierarchies
+"""
+inf = float("inf")
+UP_FILE, DOWN_FILE, RANK_FILE = "up.csr", "down.csr", "ranks.bin"
+CH_MAGIC = b"CHIE0001"
+CH_HEADER = "<8sqq"  # Magic, number of vertices and shortcuts
+
+
+def priority(out_, in_, deleted, v, S):
+    """Computes contraction priority of a vertex.
+
+    :param list[dict] out_: Remaining forward edges.
+    :param list[dict] in_: Remaining reverse edges.
+    :param list[int] deleted: Number of contracted neighbours of every vertex.
+    :param int v: Vertex id.
+    :param list[tuple] S: Shortcuts required to contract a vertex.
+    :return: Edge difference plus the number of contracted neighbours.
+
+    """
+    return len(S) - len(out_[v]) - len(in_[v]) + deleted[v]
+
+
+def witness_shortcuts(out_, in_, v, limit):
+    """Lists shortcuts required to contract a vertex.
+
+    For every incoming edge :math:`(u, v)` runs a local Dijkstra search from :math:`u` that
+    ignores :math:`v` and stops once all outgoing neighbours of :math:`v` are settled, the
+    estimates exceed the longest candidate shortcut, or the limit is reached.
+
+    :param list[dict] out_: Remaining forward edges.
+    :param list[dict] in_: Remaining reverse edges.
+    :param int v: Vertex id.
+    :param int limit: Maximum number of vertices settled by a witness search.
+    :return: List of shortcut tuples :math:`(u, x, w)`.
+
+    """
+    S = []
+    if len(out_[v]) == 0:
+        return S
+    w_max = max(out_[v].values())
+    for u, wu in in_[v].items():
+        targets = {x: wu + wx for x, wx in out_[v].items() if x != u}
+        if len(targets) == 0:
+            continue
+        d = {u: 0}
+        Q = [(0, u)]
+        settled = 0
+        left = len(targets)  # Outgoing neighbours that are not settled yet
+        bound = wu + w_max
+        while len(Q) > 0 and settled < limit and left > 0:
+            dy, y = heappop(Q)
+            if dy > d[y]:
+                continue
+            if dy > bound:
+                break
+            settled += 1
+            if y in targets:
+                left -= 1
+            for z, wz in out_[y].items():
+                dz = dy + wz
+                if z != v and dz < d.get(z, inf):
+                    d[z] = dz
+                    heappush(Q, (dz, z))
+        for x, w in targets.items():
+            if d.get(x, inf) > w:
+                S.append((u, x, w))
+    return S
+
+
+def unpack_path(H, L):
+    """Replaces shortcuts on a path with the original edges.
+
+    Complexity:
+        :math:`O(k)` where :math:`k` is the number of edges on the unpacked path.
+
+    :param ContractionHierarchy H: Contraction hierarchy.
+    :param list[int] L: Path in a hierarchy as a list of vertex ids.
+    :return: Path in the original graph as a list of vertex ids.
+
+    """
+    out = L[:1]
+    for i in range(len(L) - 1):
+        S = [(L[i], L[i + 1])]  # Stack of edges to unpack
+        while len(S) > 0:
+            u, x = S.pop()
+            v = H.shortcuts.get((u, x))
+            if v is None:
+                out.append(x)
+            else:
+                S.append((v, x))
+                S.append((u, v))
+    return out
@@ -0,0 +1,652 @@
+"""
+Compressed Sparse Row Graph
+===========================
+
+Adjacency list built out of :class:`graphs.Vertex` and :class:`graphs.Edge` objects is easy
+to read and to modify, but every vertex and every edge is a separate Python object with
+its own attribute dictionary. On graphs with millions of edges the overhead of such
+objects dominates both memory consumption and the running time of traversals.
+
+**Compressed sparse row** (CSR) representation packs an immutable graph into three flat
+arrays. Vertices are identified by dense integer ids :math:`0..n-1`. Outgoing edges of
+vertex :math:`u` occupy the slice :math:`[offsets_u, offsets_{u+1})` of the ``targets``
+array, which holds target vertex ids, and of the optional ``weights`` array, which holds
+edge weights. Position of an edge in these arrays serves as its edge id. Original vertex
+keys are kept in a separate table, so that the results can be translated back.
+
+CSR graph takes :math:`O(V+E)` space with a small constant: using :mod:`array` storage,
+an edge costs 4 bytes for a target id and 8 bytes for a weight.
+
+Algorithms in this module mirror their object-based counterparts, but instead of writing
+attributes onto vertices they return the results as arrays indexed by vertex id.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+from graphs.mst import kruskal
+
+
+class CSRGraph:
+    """Immutable compressed sparse row graph representation.
+    """
+
+    def __init__(self, keys, offsets, targets, weights=None):
+        """Immutable compressed sparse row graph representation.
+
+        :param list keys: Vertex keys indexed by vertex id.
+        :param array offsets: Offsets of the first outgoing edge of every vertex, with an
+         additional trailing offset equal to the total number of edges.
+        :param array targets: Target vertex ids of all edges grouped by source vertex.
+        :param array weights: (optional) Edge weights aligned with ``targets``.
+
+        """
+        self.keys = keys  # Vertex keys, indexed by vertex id
+        self.index = None  # Vertex ids keyed by vertex key, built on demand
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.n = len(keys)  # Number of vertices
+        self.m = len(targets)  # Number of edges
+
+    def Adj(self, u):
+        """Iterates through adjacent vertices of a vertex.
+
+        :param int u: Source vertex id.
+        :return: Next adjacent vertex id in order of insertion.
+
+        """
+        T = self.targets
+        for i in range(self.offsets[u], self.offsets[u + 1]):
+            yield T[i]
+
+    def E(self):
+        """Iterates through all edges in a graph as tuples of vertex ids.
+
+        :return: Next tuple of vertex ids, grouped by source vertex.
+
+        """
+        O, T = self.offsets, self.targets
+        for u in range(self.n):
+            for i in range(O[u], O[u + 1]):
+                yield u, T[i]
+
+
+def csr_vertex_id(C, k):
+    """Returns the id of a vertex with a given key.
+
+    Index of vertex keys is built on the first call and is cached on the graph.
+
+    Complexity:
+        :math:`O(1)`, :math:`O(V)` for the first call.
+
+    :param CSRGraph C: CSR graph.
+    :param object k: Vertex key.
+    :return: Vertex id.
+
+    """
+    if C.index is None:
+        C.index = {x: i for i, x in enumerate(C.keys)}
+    return C.index[k]
+
+
+def csr_degree(C, u):
+    """Returns degree of a vertex.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param CSRGraph C: CSR graph.
+    :param int u: Vertex id.
+    :return: Number of outgoing edges of a vertex.
+
+    """
+    return C.offsets[u + 1] - C.offsets[u]
+
+
+def csr_sources(C):
+    """Expands offsets of a CSR graph into a flat array of edge sources.
+
+    Together with ``targets`` and ``weights`` it forms a plain edge list representation
+    indexed by edge id.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: CSR graph.
+    :return: Array of source vertex ids indexed by edge id.
+
+    """
+    O = C.offsets
+    S = array('i', [0]) * C.m
+    for u in range(C.n):
+        for i in range(O[u], O[u + 1]):
+            S[i] = u
+    return S
+
+
+def dict_to_csr(D):
+    """Converts dictionary into a CSR graph.
+
+    Accepts the same dictionary formats as :func:`graphs.dict_to_graph()`. Vertex ids are
+    assigned in the order of dictionary keys.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param dict D: Input dictionary.
+    :return: Output :data:`CSRGraph` object.
+
+    """
+    keys = list(D)
+    index = {k: i for i, k in enumerate(keys)}
+    weighted = any(type(D[k]) is dict for k in keys)
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d') if weighted else None
+    for k in keys:
+        for j in D[k]:
+            targets.append(index[j])
+            if weighted:
+                weights.append(D[k][j])
+        offsets.append(len(targets))
+    return CSRGraph(keys, offsets, targets, weights)
+
+
+def edges_to_csr(E, keys=None):
+    """Builds a CSR graph out of an edge list.
+
+    Edges are given as tuples of vertex keys ``(u, v)`` for unweighted graphs or
+    ``(u, v, w)`` for weighted graphs. Vertex keys are assigned dense ids in order of their
+    first appearance, unless the complete key table is given. The edge list is collected
+    into flat source and target arrays and then grouped by source vertex with a counting
+    sort, so that the relative order of the edges of a vertex is preserved.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param iterable E: Edge tuples.
+    :param list keys: (optional) Complete list of vertex keys, which allows to include
+     vertices without edges and to fix their ids.
+    :return: Output :data:`CSRGraph` object.
+
+    """
+    keys = [] if keys is None else list(keys)
+    index = {k: i for i, k in enumerate(keys)}
+    S, T, W = array('i'), array('i'), array('d')
+    for e in E:
+        for k in e[:2]:
+            if k not in index:
+                index[k] = len(keys)
+                keys.append(k)
+        S.append(index[e[0]])
+        T.append(index[e[1]])
+        if len(e) > 2:
+            W.append(e[2])
+    n, m = len(keys), len(S)
+    if 0 < len(W) != m:
+        raise ValueError("Mixed weighted and unweighted edges")
+    offsets = array('q', [0]) * (n + 1)
+    for u in S:  # Count out-degrees
+        offsets[u + 1] += 1
+    for u in range(n):  # Prefix sums give the first edge position of every vertex
+        offsets[u + 1] += offsets[u]
+    nxt = array('q', offsets[:n])  # Next free edge position of every vertex
+    targets = array('i', [0]) * m
+    weights = array('d', [0.0]) * m if len(W) > 0 else None
+    for i in range(m):
+        u = S[i]
+        j = nxt[u]
+        targets[j] = T[i]
+        if weights is not None:
+            weights[j] = W[i]
+        nxt[u] = j + 1
+    return CSRGraph(keys, offsets, targets, weights)
+
+
+def graph_to_csr(G):
+    """Converts an object-based graph into a CSR graph.
+
+    Vertex ids follow the order of :data:`G.V`.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param graphs.Graph G: Input graph.
+    :return: Output :data:`CSRGraph` object.
+
+    """
+    keys = [v.key for v in G.V]
+    index = {k: i for i, k in enumerate(keys)}
+    weighted = any(e.weight is not None for u in G.V for e in u.f_edges.values())
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d') if weighted else None
+    for u in G.V:
+        for k, e in u.f_edges.items():
+            targets.append(index[k])
+            if weighted:
+                weights.append(e.weight)
+        offsets.append(len(targets))
+    return CSRGraph(keys, offsets, targets, weights)
+
+
+def csr_transpose(C):
+    """Builds a transposed CSR graph with all edges reversed.
+
+    Edges of the transposed graph keep the weights of the original edges. Counting sort
+    by target vertex makes the transposition linear.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: CSR graph.
+    :return: Transposed :data:`CSRGraph` object over the same vertex ids.
+
+    """
+    n, m, O, T, W = C.n, C.m, C.offsets, C.targets, C.weights
+    offsets = array('q', [0]) * (n + 1)
+    for v in T:  # Count in-degrees
+        offsets[v + 1] += 1
+    for v in range(n):
+        offsets[v + 1] += offsets[v]
+    nxt = array('q', offsets[:n])  # Next free edge position of every vertex
+    targets = array('i', [0]) * m
+    weights = array('d', [0.0]) * m if W is not None else None
+    for u in range(n):
+        for i in range(O[u], O[u + 1]):
+            v = T[i]
+            j = nxt[v]
+            targets[j] = u
+            if W is not None:
+                weights[j] = W[i]
+            nxt[v] = j + 1
+    return CSRGraph(C.keys, offsets, targets, weights)
+
+
+def csr_bfs(C, s):
+    """Breadth-first search of a CSR graph.
+
+    Same algorithm as :func:`graphs.search.bfs()`. Vertex colors are implied by distances:
+    undiscovered vertices have a distance of :math:`-1`. The queue is a preallocated array
+    of :math:`n` vertex ids, since every vertex is enqueued at most once.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: Graph to search.
+    :param int s: Starting vertex id.
+    :return: Tuple of arrays of distances and parents indexed by vertex id. Unreachable
+     vertices have a distance of :math:`-1`, root and unreachable vertices have a parent
+     of :math:`-1`.
+
+    """
+    n, O, T = C.n, C.offsets, C.targets
+    d = array('q', [-1]) * n
+    p = array('q', [-1]) * n
+    Q = array('q', [0]) * n
+    head, tail = 0, 1
+    Q[0] = s
+    d[s] = 0
+    while head < tail:
+        u = Q[head]
+        head += 1
+        du = d[u] + 1
+        for i in range(O[u], O[u + 1]):
+            v = T[i]
+            if d[v] == -1:
+                d[v] = du
+                p[v] = u
+                Q[tail] = v
+                tail += 1
+    return d, p
+
+
+def csr_dfs(C):
+    """Depth-first search of a CSR graph.
+
+    Same algorithm as :func:`graphs.search.dfs()`. Recursion is replaced by an explicit
+    stack of vertex ids, and the position of the next unexplored edge of every vertex is
+    kept in a separate array, so the search never runs into the recursion limit.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: Graph to search.
+    :return: Tuple of arrays of discovery times, finishing times and parents indexed by
+     vertex id.
+
+    """
+    n, O, T = C.n, C.offsets, C.targets
+    d = array('q', [0]) * n  # Zero discovery time marks an undiscovered vertex
+    f = array('q', [0]) * n
+    p = array('q', [-1]) * n
+    nxt = array('q', O[:n])  # Next unexplored edge of every vertex
+    S = array('q')  # Stack of vertices being explored
+    t = 0
+    for r in range(n):
+        if d[r] != 0:
+            continue
+        t += 1
+        d[r] = t
+        S.append(r)
+        while len(S) > 0:
+            u = S[-1]
+            i = nxt[u]
+            if i < O[u + 1]:
+                nxt[u] = i + 1
+                v = T[i]
+                if d[v] == 0:
+                    t += 1
+                    d[v] = t
+                    p[v] = u
+                    S.append(v)
+            else:
+                S.pop()  # Vertex `u` is finished
+                t += 1
+                f[u] = t
+    return d, f, p
+
+
+def csr_topological_sort(C):
+    """Topological sort of a CSR directed acyclic graph.
+
+    Vertices are listed in reverse order of their DFS finishing times.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: DAG.
+    :return: Array of vertex ids in order of precedence.
+
+    """
+    _, f, _ = csr_dfs(C)
+    B = array('q', [-1]) * (2 * C.n + 1)  # Vertices bucketed by their finishing time
+    for u in range(C.n):
+        B[f[u]] = u
+    return array('q', (u for u in reversed(B) if u != -1))
+
+
+def csr_dijkstra(C, s):
+    """Dijkstra single-source shortest-paths algorithm on a CSR graph.
+
+    Priority queue holds ``(d, u)`` tuples. Instead of updating the position of a vertex
+    in a queue, a relaxed vertex is pushed again, and outdated entries are skipped when
+    popped.
+
+    Complexity:
+        :math:`O(E\\log E)`.
+
+    :param CSRGraph C: Weighted graph with non-negative weights.
+    :param int s: Starting vertex id.
+    :return: Tuple of arrays of shortest-path estimates and parents indexed by vertex id.
+
+    """
+    n, O, T, W = C.n, C.offsets, C.targets, C.weights
+    if W is None:
+        raise AttributeError("Not a weighted graph")
+    d = array('d', [inf]) * n
+    p = array('q', [-1]) * n
+    done = bytearray(n)
+    d[s] = 0.0
+    Q = [(0.0, s)]
+    while len(Q) > 0:
+        du, u = heappop(Q)
+        if done[u]:
+            continue  # Outdated queue entry
+        done[u] = 1
+        for i in range(O[u], O[u + 1]):
+            v = T[i]
+            dv = du + W[i]
+            if dv < d[v]:
+                d[v] = dv
+                p[v] = u
+                heappush(Q, (dv, v))
+    return d, p
+
+
+def csr_bellman_ford(C, s, spfa=False):
+    """Bellman-Ford single-source shortest-paths algorithm on a CSR graph.
+
+    In the default mode, the algorithm makes passes over flat arrays of edge sources,
+    targets and weights, and stops as soon as a pass makes no changes. Negative-weight
+    cycle is reported if the estimates still change after :math:`|V|-1` passes.
+
+    In the **SPFA** (shortest path faster algorithm) mode, only the edges of vertices whose
+    estimates have changed are relaxed. Such vertices are kept in a FIFO queue, and every
+    vertex is queued at most once at a time. Number of edges on the current path to every
+    vertex is tracked, and a path of :math:`|V|` edges means a negative-weight cycle.
+
+    Complexity:
+        :math:`O(VE)` in the worst case for both modes. Early termination and SPFA make
+        the algorithm run much faster on typical graphs.
+
+    :param CSRGraph C: Weighted directed graph.
+    :param int s: Starting vertex id.
+    :param bool spfa: Use SPFA mode.
+    :return: Tuple of a flag, which is :data:`True` iff the graph contains no
+     negative-weight cycles reachable from the starting vertex, and arrays of shortest-path
+     estimates and parents indexed by vertex id.
+
+    """
+    n, O, T, W = C.n, C.offsets, C.targets, C.weights
+    if W is None:
+        raise AttributeError("Not a weighted graph")
+    d = array('d', [inf]) * n
+    p = array('q', [-1]) * n
+    d[s] = 0.0
+    if spfa:
+        Q = deque([s])
+        queued = bytearray(n)
+        queued[s] = 1
+        k = array('q', [0]) * n  # Number of edges on a path
+        while len(Q) > 0:
+            u = Q.popleft()
+            queued[u] = 0
+            du = d[u]
+            for i in range(O[u], O[u + 1]):
+                v = T[i]
+                if du + W[i] < d[v]:
+                    d[v] = du + W[i]
+                    p[v] = u
+                    k[v] = k[u] + 1
+                    if k[v] >= n:
+                        return False, d, p
+                    if not queued[v]:
+                        queued[v] = 1
+                        Q.append(v)
+        return True, d, p
+    S = csr_sources(C)
+    for _ in range(n):  # Last pass only checks for negative-weight cycles
+        changed = False
+        for u, v, w in zip(S, T, W):
+            if d[u] + w < d[v]:
+                d[v] = d[u] + w
+                p[v] = u
+                changed = True
+        if not changed:
+            return True, d, p
+    return False, d, p
+
+
+def csr_mst_kruskal(C):
+    """Computes a minimum spanning tree of a CSR graph.
+
+    Undirected graphs are expected to list every edge in both directions. CSR arrays
+    already are edge arrays indexed by edge id, so they are passed to
+    :func:`graphs.mst.kruskal()` as they are, along with the expanded edge sources.
+
+    Complexity:
+        :math:`O(E\\log V)`.
+
+    :param CSRGraph C: Weighted graph.
+    :return: List of edge ids.
+
+    """
+    if C.weights is None:
+        raise AttributeError("Not a weighted graph")
+    return kruskal(C.n, csr_sources(C), C.targets, C.weights)
+
+
+def csr_save(C, path):
+    """Writes a CSR graph to a binary file.
+
+    File starts with a fixed-size header: a magic number, the numbers of vertices and
+    edges, a weighted flag and a key table kind. It is followed by the raw contents of the
+    ``offsets``, ``targets`` and ``weights`` arrays in native little-endian byte order, and
+    the key table. Every section starts at a multiple of 8 bytes, so that it can be mapped
+    as a typed array as it is.
+
+    Key table is omitted if the keys are vertex ids themselves. Integer keys are stored as
+    an array of 64-bit integers. String keys are stored as UTF-8 bytes, preceded by an
+    array of their offsets. Other key types are not supported.
+
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param CSRGraph C: CSR graph.
+    :param str path: Output file path.
+
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Unsupported byte order")
+    n, m = C.n, C.m
+    K = C.keys
+    if all(type(k) is int for k in K):
+        kind = KEYS_RANGE if all(k == i for i, k in enumerate(K)) else KEYS_INT
+    elif all(type(k) is str for k in K):
+        kind = KEYS_STR
+    else:
+        raise ValueError("Unsupported vertex key type")
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, n, m, C.weights is not None, kind))
+        write_section(f, as_array('q', C.offsets))
+        write_section(f, as_array('i', C.targets))
+        if C.weights is not None:
+            write_section(f, as_array('d', C.weights))
+        if kind == KEYS_INT:
+            write_section(f, array('q', K))
+        elif kind == KEYS_STR:
+            B = [k.encode("utf-8") for k in K]
+            O = array('q', [0]) * (n + 1)
+            for i in range(n):
+                O[i + 1] = O[i] + len(B[i])
+            write_section(f, O)
+            write_section(f, b"".join(B))
+
+
+def csr_load(path):
+    """Opens a CSR graph from a binary file without reading it.
+
+    The file is memory-mapped read-only, and the graph arrays are typed
+    :data:`memoryview` slices of the mapping, so that opening a graph takes constant time
+    regardless of its size. Pages are loaded by the operating system on first access and
+    are shared between all processes that map the same file. String keys are decoded on
+    access.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param str path: Input file path written by :func:`csr_save()`.
+    :return: Output :data:`CSRGraph` object backed by the file.
+
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Unsupported byte order")
+    with open(path, "rb") as f:
+        M = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    magic, n, m, weighted, kind = struct.unpack_from(HEADER, M)
+    if magic != MAGIC:
+        raise ValueError("Not a CSR graph file")
+    i = struct.calcsize(HEADER)
+    offsets, i = read_section(M, i, 'q', n + 1)
+    targets, i = read_section(M, i, 'i', m)
+    weights = None
+    if weighted:
+        weights, i = read_section(M, i, 'd', m)
+    if kind == KEYS_RANGE:
+        keys = range(n)
+    elif kind == KEYS_INT:
+        keys, i = read_section(M, i, 'q', n)
+    else:
+        O, i = read_section(M, i, 'q', n + 1)
+        keys = MappedKeys(O, M[i:i + O[n]])
+    return CSRGraph(keys, offsets, targets, weights)
+
+
+class MappedKeys:
+    """Read-only sequence of string keys stored as UTF-8 bytes and their offsets.
+    """
+
+    def __init__(self, O, B):
+        """Read-only sequence of string keys stored as UTF-8 bytes and their offsets.
+
+        :param memoryview O: Offsets of keys, with an additional trailing offset.
+        :param memoryview B: Concatenated UTF-8 bytes of keys.
+
+        """
+        self.O = O
+        self.B = B
+
+    def __len__(self):
+        return len(self.O) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("Key index out of range")
+        return str(self.B[self.O[i]:self.O[i + 1]], "utf-8")
+
+
+"""
+Constants and subroutines used in CSR graph storage
+"""
+MAGIC = b"CSRG0001"
+HEADER = "<8sqq?xxxI"  # Magic, number of vertices and edges, weighted flag, keys kind
+KEYS_RANGE, KEYS_INT, KEYS_STR = 0, 1, 2
+
+
+def as_array(t, X):
+    """Returns a typed buffer, converting it to an array if needed.
+
+    :param str t: Type code.
+    :param X: Array, memoryview or sequence of numbers.
+    :return: Buffer with items of a given type.
+
+    """
+    if isinstance(X, array) and X.typecode == t:
+        return X
+    if isinstance(X, memoryview) and X.format == t:
+        return X
+    return array(t, X)
+
+
+def write_section(f, X):
+    """Writes a buffer to a file and pads it to a multiple of 8 bytes.
+
+    :param file f: Output binary file.
+    :param X: Buffer to write.
+
+    """
+    k = memoryview(X).nbytes
+    f.write(X)
+    f.write(bytes(-k % 8))
+
+
+def read_section(M, i, t, k):
+    """Maps a section of a file as a typed array.
+
+    :param memoryview M: File mapping.
+    :param int i: Byte offset of a section.
+    :param str t: Type code.
+    :param int k: Number of items.
+    :return: Tuple of a typed :data:`memoryview` and the byte offset of the next section.
+
+    """
+    size = struct.calcsize(t) * k
+    return M[i:i + size].cast(t), i + size + (-size % 8)
+
+
+inf = float("inf")
@@ -0,0 +1,148 @@
+"""
+Dynamic Shortest Paths
+======================
+
+Dynamic shortest-paths problem asks to maintain shortest paths from a single source while
+the graph changes: edges are inserted and deleted, and their weights go up and down.
+Running :func:`graphs.shortest_paths.dijkstra()` from scratch after every change wastes
+time, since a change usually affects only a small part of the shortest-path tree.
+
+Algorithm in this module follows the approach of Ramalingam and Reps. Updates are
+processed in batches. Weight decreases and insertions can only make paths shorter, and
+they are propagated with a Dijkstra search seeded with the improved vertices. Weight
+increases and deletions are harder: the estimates of the vertices whose shortest paths
+used a changed edge are no longer valid. Such vertices are found by walking the
+shortest-path tree below the changed edges, but a vertex that has an alternative
+predecessor giving the same distance keeps its estimate, and its subtree is spared. Only
+the remaining **affected** vertices are recomputed.
+
+The amount of work is bounded by the number of vertices whose distance or predecessor
+actually changes, and the edges adjacent to them, rather than by the size of the graph.
+"""
+from heapq import heappush, heappop
+
+from graphs import Graph, Vertex, weight, add_edge, remove_edge
+from graphs.shortest_paths import dijkstra, ShortestPaths
+
+
+class DynamicShortestPaths:
+    """Shortest paths from a single source maintained under edge updates.
+
+    Holds a graph and a :class:`graphs.shortest_paths.ShortestPaths` record of the current
+    shortest-path estimates and predecessors.
+    """
+
+    def __init__(self, G, s):
+        """Shortest paths from a single source maintained under edge updates.
+
+        Initial shortest paths are computed with
+        :func:`graphs.shortest_paths.dijkstra()`.
+
+        :param Graph G: Weighted directed graph with non-negative weights.
+        :param Vertex s: Starting vertex.
+
+        """
+        self.G = G
+        self.R = dijkstra(G, s)
+
+
+def update_edges(D, U):
+    """Applies a batch of edge updates and repairs the shortest paths.
+
+    Every update is a tuple :math:`(u, v, w)`. If :math:`w` is :data:`None`, the edge
+    :math:`(u, v)` is deleted, otherwise the edge is inserted, or its weight is changed.
+
+    Repair is done in three steps:
+
+    1. **Invalidation.** Targets of deleted or heavier tree edges are queued in the order
+       of their old estimates. A queued vertex keeps its estimate if it has another
+       predecessor with a strictly smaller estimate, which has been confirmed valid and
+       leads to the vertex with the same distance. Otherwise the vertex is affected, its
+       estimate is reset, and its tree children are queued.
+    2. **Seeding.** Every affected vertex gets the best estimate through its unaffected
+       predecessors. Targets of lighter or inserted edges are updated if the edge improves
+       their estimate.
+    3. **Propagation.** A Dijkstra search with lazy deletion starts from all the updated
+       vertices and relaxes their outgoing edges.
+
+    Complexity:
+        :math:`O(k \\log k)` where :math:`k` is the number of affected vertices and
+        vertices with improved estimates, plus the number of their incident edges.
+
+    :param DynamicShortestPaths D: Dynamic shortest paths.
+    :param list[tuple] U: Edge updates.
+    :return: Set of vertices whose shortest-path weight has changed.
+
+    """
+    G, R = D.G, D.R
+    d, p = R.d, R.p
+    old = {}  # Previous estimates of updated vertices
+    Q = []  # Invalidation queue
+    c = 0
+    for u, v, w in U:
+        e = u.f_edges.get(v.key)
+        before = inf if e is None else weight(u, v)
+        if w is None:
+            if e is not None:
+                remove_edge(G, u, v)
+        else:
+            add_edge(G, u, v, w)
+        after = inf if w is None else weight(u, v)
+        if after > before and p.get(v) is u:
+            heappush(Q, (d[v], c, v))
+            c += 1
+    A = set()  # Affected vertices
+    while len(Q) > 0:
+        dx, _, x = heappop(Q)
+        if x in A or x not in d:
+            continue
+        for y in G.RAdj(x):  # Look for an alternative predecessor
+            if y not in A and y in d and d[y] < dx and d[y] + weight(y, x) == dx:
+                p[x] = y
+                break
+        else:
+            A.add(x)
+            for y in G.Adj(x):
+                if p.get(y) is x:
+                    heappush(Q, (d[y], c, y))
+                    c += 1
+    for x in A:
+        old[x] = d.pop(x)
+        del p[x]
+    Q = []  # Propagation queue
+    for x in A:
+        for y in G.RAdj(x):
+            if y in d and d[y] + weight(y, x) < d.get(x, inf):
+                d[x] = d[y] + weight(y, x)
+                p[x] = y
+        if x in d:
+            heappush(Q, (d[x], c, x))
+            c += 1
+    for u, v, w in U:
+        if v.key in u.f_edges and u in d and d[u] + weight(u, v) < d.get(v, inf):
+            old.setdefault(v, d.get(v, inf))
+            d[v] = d[u] + weight(u, v)
+            p[v] = u
+            heappush(Q, (d[v], c, v))
+            c += 1
+    while len(Q) > 0:
+        du, _, u = heappop(Q)
+        if du != d[u]:
+            continue  # Outdated queue entry
+        for v in G.Adj(u):
+            dv = du + weight(u, v)
+            if dv < d.get(v, inf):
+                old.setdefault(v, d.get(v, inf))
+                d[v] = dv
+                p[v] = u
+                heappush(Q, (dv, c, v))
+                c += 1
+    for x in old:  # Only vertices that lost or got an estimate can change being settled
+        if x in d:
+            R.S.add(x)
+        else:
+            R.S.discard(x)
+    return {x for x, dx in old.items() if d.get(x, inf) != dx}
+
+
+inf = float("inf")
@@ -3,15 +3,23 @@ Minimum Spanning Trees
 ======================
 """
 
-from heapq import heappush, heappop
+import os
+from array import array
+from multiprocessing.shared_memory import SharedMemory
 
-from basic.disjoint_set import make_set, find_set, union
+from basic.heaps import IndexedHeap, indexed_heap_insert, indexed_heap_extract_min
+from basic.heaps import indexed_heap_contains, indexed_heap_decrease_key
+from basic.disjoint_set import DisjointSet
 from graphs import Graph, Vertex, weight
 
 
 def mst_kruskal(G):
     """Computes a minimum spanning tree of a graph.
 
+    Edges are listed once into flat arrays of source and target vertex indices and edge
+    weights, and the tree is grown by :func:`kruskal()`. Undirected graphs are expected to
+    list every edge in both directions.
+
     Complexity:
         :math:`O(E\\log V)`
 
@@ -19,23 +27,150 @@ def mst_kruskal(G):
     :return: List of edges.
 
     """
+    E, U, V, W = edge_arrays(G)
+    return [E[i] for i in kruskal(len(G.V), U, V, W)]
+
+
+def kruskal(n, U, V, W):
+    """Kruskal's minimum spanning tree algorithm over edge arrays.
+
+    The algorithm considers edges in order of increasing weight and adds an edge to the
+    forest if it connects two different trees. Edge indices are sorted by weight just once
+    (an *argsort* of the weight array), and the trees are tracked with an array-backed
+    :class:`basic.disjoint_set.DisjointSet`. A spanning tree has exactly :math:`|V|-1`
+    edges, so the scan stops as soon as that many edges are accepted.
+
+    If the graph is disconnected, all edges are scanned and the result is a minimum
+    spanning forest.
+
+    Complexity:
+        :math:`O(E\\log E)` for sorting, which is :math:`O(E\\log V)`, and
+        :math:`O(E\\alpha(V))` for the scan.
+
+    :param int n: Number of vertices.
+    :param array U: Source vertex indices indexed by edge index.
+    :param array V: Target vertex indices indexed by edge index.
+    :param array W: Edge weights indexed by edge index.
+    :return: List of edge indices in order of acceptance.
+
+    """
+    D = DisjointSet(n)
     A = []
-    for v in G.V:
-        make_set(v)
-    E = []
-    for u, v in G.E():  # Sort edges by their weight
-        heappush(E, u.f_edges[v.key])
-    for edge in E:
-        u, v = edge.u, edge.v
-        if find_set(u) is not find_set(v):
-            A.append(u.f_edges[v.key])
-            union(u, v)
+    for i in sorted(range(len(W)), key=W.__getitem__):
+        if D.union(U[i], V[i]):
+            A.append(i)
+            if len(A) == n - 1:
+                break
+    return A
+
+
+def mst_boruvka(G, executor=None, k=None):
+    """Computes a minimum spanning forest of a graph.
+
+    Edges are listed once into flat arrays, and the forest is grown by :func:`boruvka()`.
+    Undirected graphs are expected to list every edge in both directions.
+
+    Complexity:
+        :math:`O(E\\log V)`
+
+    :param Graph G: Weighted graph.
+    :param concurrent.futures.ProcessPoolExecutor executor: (optional) Executor to search
+     for the cheapest edges on.
+    :param int k: (optional) Number of edge partitions per round.
+    :return: List of edges.
+
+    """
+    E, U, V, W = edge_arrays(G)
+    return [E[i] for i in boruvka(len(G.V), U, V, W, executor, k)]
+
+
+def boruvka(n, U, V, W, executor=None, k=None):
+    """Borůvka's minimum spanning forest algorithm over edge arrays.
+
+    Borůvka's algorithm works in rounds. In each round, every component of the forest
+    finds its cheapest outgoing edge, all these edges are added to the forest at once, and
+    the components they connect are contracted. Every round at least halves the number of
+    components, so there are at most :math:`\\log V` rounds. Ties between equal weights
+    are broken by edge index, which rules out cycles among the selected edges.
+
+    Search for the cheapest edges is a scan over independent ranges of the edge arrays,
+    so it parallelizes naturally. With an executor, edge arrays and component labels are
+    placed in :mod:`multiprocessing.shared_memory` once, each worker scans its partition
+    in place with :func:`cheapest_edges()` and returns only the best candidate per
+    component. Contraction is cheap and runs in the calling process.
+
+    The algorithm stops once no component has an outgoing edge. If the graph is
+    disconnected, the result is a minimum spanning forest with a tree per connected
+    component.
+
+    Complexity:
+        :math:`O(E\\log V)`, :math:`O(E/k)` per round per worker.
+
+    :param int n: Number of vertices.
+    :param array U: Source vertex indices indexed by edge index.
+    :param array V: Target vertex indices indexed by edge index.
+    :param array W: Edge weights indexed by edge index.
+    :param concurrent.futures.ProcessPoolExecutor executor: (optional) Executor to search
+     for the cheapest edges on.
+    :param int k: (optional) Number of edge partitions per round. Defaults to the number of
+     processors.
+    :return: List of edge indices.
+
+    """
+    m = len(W)
+    k = k or os.cpu_count() or 1
+    P = [(m * j // k, m * (j + 1) // k) for j in range(k)]  # Edge partitions
+    D = DisjointSet(n)
+    A = []
+    M, comp = None, None  # Shared memory blocks and component labels
+    try:
+        if executor is None:
+            comp = array('q', range(n))  # Component labels
+        else:
+            M = [SharedMemory(create=True, size=max(1, 8 * x)) for x in (m, m, m, n)]
+            for b, X, t in zip(M, (U, V, W), ('q', 'q', 'd')):
+                b.buf[:8 * m] = array(t, X).tobytes()
+            comp = M[3].buf[:8 * n].cast('q')
+            for x in range(n):
+                comp[x] = x
+            names = [b.name for b in M]
+        while True:
+            if executor is None:
+                R = [cheapest_edges(comp, U, V, W, lo, hi) for lo, hi in P]
+            else:
+                R = executor.map(shared_cheapest_edges, [names] * k, [n] * k, [m] * k,
+                                 *zip(*P))
+            B = {}  # Cheapest outgoing edge keyed by component
+            for r in R:
+                for c, i in r.items():
+                    j = B.get(c)
+                    if j is None or (W[i], i) < (W[j], j):
+                        B[c] = i
+            if len(B) == 0:
+                break
+            for i in B.values():
+                if D.union(U[i], V[i]):  # Edge may have been selected by both components
+                    A.append(i)
+            for x in range(n):
+                comp[x] = D.find(x)
+    finally:
+        if M is not None:
+            if comp is not None:
+                comp.release()
+            for b in M:
+                b.close()
+                b.unlink()
     return A
 
 
 def mst_prim(G, r):
     """Computes a minimum spanning tree of a graph.
 
+    Vertices that are not yet in the tree are kept in an addressable priority queue keyed
+    by the weight of the lightest edge connecting them to the tree. Indexed heap answers
+    the membership test in :math:`O(1)` time and restores the heap order whenever the key
+    of a vertex is decreased.
+
     Complexity:
         :math:`O(V\\log V+E\\log V)`
 
@@ -47,32 +182,90 @@ def mst_prim(G, r):
         u.d = inf  # `d` parameter helps to order the vertices
         u.p = None
     r.d = 0
-    Q = []
+    Q = IndexedHeap()
     for v in G.V:  # Sort vertices by their `d` attribute
-        heappush(Q, (v.d, v))
-    while len(Q) > 0:
-        _, u = heappop(Q)
+        indexed_heap_insert(Q, v, v.d)
+    while len(Q.A) > 0:
+        u = indexed_heap_extract_min(Q)
         for v in G.Adj(u):
-            if in_queue(v, Q) and weight(u, v) < v.d:
+            if indexed_heap_contains(Q, v) and weight(u, v) < v.d:
                 v.p = u
                 v.d = weight(u, v)
+                indexed_heap_decrease_key(Q, v, v.d)
+
+
+inf = float("inf")
+
 
+def edge_arrays(G):
+    """Lists edges of a graph into flat arrays.
 
-def in_queue(x, Q):
-    """A utility function for Prim's algorithm that checks whether the vertex is in a queue.
+    Complexity:
+        :math:`O(V+E)`.
+
+    :param Graph G: Weighted graph.
+    :return: Tuple of the list of edges, and arrays of source vertex indices, target
+     vertex indices and weights, all indexed by edge index. Vertex indices follow the
+     order of :data:`G.V`.
+
+    """
+    index = {v.key: i for i, v in enumerate(G.V)}
+    E = []
+    U, V, W = array('q'), array('q'), array('d')
+    for u in G.V:
+        for k, e in u.f_edges.items():
+            E.append(e)
+            U.append(index[u.key])
+            V.append(index[k])
+            W.append(e.weight)
+    return E, U, V, W
+
+
+def cheapest_edges(comp, U, V, W, lo, hi):
+    """Finds the cheapest outgoing edge of every component within a range of edges.
 
     Complexity:
-        :math:`O(n)` where :math:`n` is the number of tuples in the queue.
+        :math:`O(hi-lo)`.
 
-    :param Vertex x: Target vertex.
-    :param list Q: Queue of tuples.
-    :return: :data:`True` if vertex was found in a queue, :data:`False` otherwise.
+    :param array comp: Component labels indexed by vertex index.
+    :param array U: Source vertex indices indexed by edge index.
+    :param array V: Target vertex indices indexed by edge index.
+    :param array W: Edge weights indexed by edge index.
+    :param int lo: First edge index of a range.
+    :param int hi: Edge index past the end of a range.
+    :return: Dictionary of edge indices keyed by component label.
 
     """
-    for _, v in Q:
-        if x == v:
-            return True
-    return False
+    B = {}
+    for i in range(lo, hi):
+        cu, cv = comp[U[i]], comp[V[i]]
+        if cu != cv:
+            w = W[i]
+            for c in (cu, cv):
+                j = B.get(c)
+                if j is None or w < W[j] or (w == W[j] and i < j):
+                    B[c] = i
+    return B
 
 
-inf = float("inf")
+def shared_cheapest_edges(names, n, m, lo, hi):
+    """Runs :func:`cheapest_edges()` over the arrays placed in shared memory.
+
+    :param list[str] names: Names of shared memory blocks holding edge sources, targets,
+     weights and component labels.
+    :param int n: Number of vertices.
+    :param int m: Number of edges.
+    :param int lo: First edge index of a range.
+    :param int hi: Edge index past the end of a range.
+    :return: Dictionary of edge indices keyed by component label.
+
+    """
+    M = [SharedMemory(name=x) for x in names]
+    X = [b.buf[:8 * x].cast(t) for b, x, t in zip(M, (m, m, m, n), ('q', 'q', 'd', 'q'))]
+    try:
+        return cheapest_edges(X[3], X[0], X[1], X[2], lo, hi)
+    finally:
+        for x in X:
+            x.release()
+        for b in M:
+            b.close()
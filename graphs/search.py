@@ -2,8 +2,12 @@
 Graph Search Algorithms
 =======================
 """
+import os
+from array import array
+
 from basic.fifo import Queue, enqueue, dequeue
 from graphs import Graph, Vertex, Counter
+from graphs.csr import CSRGraph, csr_transpose
 
 
 def bfs(G, s):
@@ -50,7 +54,7 @@ def bfs(G, s):
     while Q.length != 0:
         u = dequeue(Q)
         for v in G.Adj(u):
-            if v.color is WHITE:
+            if v.color == WHITE:
                 v.color = GRAY  # extend frontier
                 v.d = u.d + 1  # calculate distance to vertex `v`
                 v.p = u  # save pointer to parent
@@ -71,8 +75,8 @@ def dfs(G):
     at which the exploration of edges of the vertex was finished.
 
     DFS yields valuable information about the graph. The basic property states that the
-    predecessor sub-graph forms a forest of trees encompassing the structure of recursive
-    calls of :func:`dfs_visit()`. This is called the forest of depth-first trees.
+    predecessor sub-graph forms a forest of trees encompassing the order of vertex visits
+    by :func:`dfs_visit()`. This is called the forest of depth-first trees.
 
     Another property states that if we print the discovery and finishing times of a
     vertex :math:`u` as expressions :math:`(u` and :math:`u)`, the resulting output makes a
@@ -97,7 +101,7 @@ def dfs(G):
     to update the algorithm to perform a local DFS.
 
     Complexity:
-        :math:`O(V+E)`, no additional space is used.
+        :math:`O(V+E)`, with :math:`O(V)` space for the stack of visited vertices.
 
     :param Graph G: Graph to search.
 
@@ -108,37 +112,299 @@ def dfs(G):
         u.color = WHITE  # mark vertex as undiscovered
         u.p = None  # reset parent
     for u in G.V:
-        if u.color is WHITE:
+        if u.color == WHITE:
             dfs_visit(G, u, t)
 
 
+def direction_optimizing_bfs(C, s, R=None, alpha=14, beta=24):
+    """Direction-optimizing breadth-first search of a CSR graph.
+
+    Level-synchronous BFS expands the whole frontier at once. Conventional **top-down**
+    step scans the edges of every frontier vertex looking for undiscovered vertices. On
+    low-diameter graphs with skewed degree distribution the frontier quickly grows to
+    cover a large part of a graph, and most of the scanned edges lead to vertices that are
+    already discovered.
+
+    **Bottom-up** step turns the search around: every undiscovered vertex scans its
+    incoming edges looking for a parent in the frontier, and stops as soon as one is found.
+    Frontier is kept as a bit map (a :data:`bytearray` of flags) for constant time
+    membership tests. Bottom-up step pays off when the frontier is large, so the search
+    switches to it when the number of edges leaving the frontier :math:`m_f` exceeds
+    :math:`m_u/\\alpha`, where :math:`m_u` is the number of edges leaving undiscovered
+    vertices, and switches back to top-down when the frontier shrinks below
+    :math:`n/\\beta` vertices.
+
+    Distances are the same as those computed by :func:`bfs()`, although a vertex may be
+    assigned a different parent from the same level.
+
+    Complexity:
+        :math:`O(V+E)` for top-down steps, with :math:`O(V)` per bottom-up step in
+        addition to the scanned edges.
+
+    :param CSRGraph C: Graph to search.
+    :param int s: Starting vertex id.
+    :param CSRGraph R: (optional) Transposed graph. Same graph can be passed for an
+     undirected graph. Transposed graph is built with
+     :func:`graphs.csr.csr_transpose()` by default.
+    :param float alpha: Top-down to bottom-up switching threshold.
+    :param float beta: Bottom-up to top-down switching threshold.
+    :return: Tuple of arrays of distances and parents indexed by vertex id. Unreachable
+     vertices have a distance of :math:`-1`, root and unreachable vertices have a parent
+     of :math:`-1`.
+
+    """
+    if R is None:
+        R = csr_transpose(C)
+    n, O, T = C.n, C.offsets, C.targets
+    RO, RT = R.offsets, R.targets
+    d = array('q', [-1]) * n
+    p = array('q', [-1]) * n
+    d[s] = 0
+    F = [s]  # Frontier
+    m_u = C.m - (O[s + 1] - O[s])  # Edges leaving undiscovered vertices
+    top_down = True
+    level = 0
+    while len(F) > 0:
+        m_f = 0  # Edges leaving the frontier
+        for u in F:
+            m_f += O[u + 1] - O[u]
+        if top_down and m_f > m_u / alpha:
+            top_down = False
+        elif not top_down and len(F) < n / beta:
+            top_down = True
+        level += 1
+        N = []  # Next frontier
+        if top_down:
+            for u in F:
+                for i in range(O[u], O[u + 1]):
+                    v = T[i]
+                    if d[v] == -1:
+                        d[v] = level
+                        p[v] = u
+                        N.append(v)
+        else:
+            B = bytearray(n)  # Frontier bit map
+            for u in F:
+                B[u] = 1
+            for v in range(n):
+                if d[v] == -1:
+                    for i in range(RO[v], RO[v + 1]):
+                        u = RT[i]
+                        if B[u]:
+                            d[v] = level
+                            p[v] = u
+                            N.append(v)
+                            break
+        for v in N:
+            m_u -= O[v + 1] - O[v]
+        F = N
+    return d, p
+
+
+def multi_source_bfs(C, S):
+    """Multi-source breadth-first search of a CSR graph.
+
+    All starting vertices are enqueued at distance zero before the search begins, so a
+    single pass computes the distance from every vertex to the nearest starting vertex.
+    This is the same as a BFS from a virtual vertex connected to all starting vertices.
+
+    Complexity:
+        :math:`O(V+E)` regardless of the number of starting vertices.
+
+    :param CSRGraph C: Graph to search.
+    :param iterable S: Starting vertex ids.
+    :return: Tuple of arrays of distances and parents indexed by vertex id. Unreachable
+     vertices have a distance of :math:`-1`, starting and unreachable vertices have a
+     parent of :math:`-1`.
+
+    """
+    n, O, T = C.n, C.offsets, C.targets
+    d = array('q', [-1]) * n
+    p = array('q', [-1]) * n
+    Q = array('q', [0]) * n
+    head, tail = 0, 0
+    for s in S:
+        if d[s] == -1:
+            d[s] = 0
+            Q[tail] = s
+            tail += 1
+    while head < tail:
+        u = Q[head]
+        head += 1
+        du = d[u] + 1
+        for i in range(O[u], O[u + 1]):
+            v = T[i]
+            if d[v] == -1:
+                d[v] = du
+                p[v] = u
+                Q[tail] = v
+                tail += 1
+    return d, p
+
+
+def grid_bfs(A, n, S):
+    """Multi-source breadth-first search of a grid.
+
+    Grid of :math:`m` rows and :math:`n` columns is given as a flat passability map, see
+    :func:`grid_mask()`. Tile :math:`(y, x)` has an index :math:`yn+x` and is adjacent to
+    at most four horizontal and vertical neighbours, so that the grid graph never needs to
+    be built. Distances are stored in a flat array, and the queue is a preallocated array
+    of tile indices.
+
+    Complexity:
+        :math:`O(mn)`.
+
+    :param bytes A: Grid passability map.
+    :param int n: Horizontal size of a grid.
+    :param iterable S: Coordinates :math:`(y, x)` of starting tiles.
+    :return: Array of distances to the nearest starting tile indexed by tile index.
+     Impassable and unreachable tiles have a distance of :math:`-1`.
+
+    """
+    N = len(A)
+    d = array('q', [-1]) * N
+    Q = array('q', [0]) * N
+    head, tail = 0, 0
+    for y, x in S:
+        i = y * n + x
+        if d[i] == -1:
+            d[i] = 0
+            Q[tail] = i
+            tail += 1
+    while head < tail:
+        i = Q[head]
+        head += 1
+        di = d[i] + 1
+        x = i % n
+        for j in (i - n, i + 1 if x + 1 < n else -1, i + n, i - 1 if x > 0 else -1):
+            if 0 <= j < N and A[j] and d[j] == -1:
+                d[j] = di
+                Q[tail] = j
+                tail += 1
+    return d
+
+
+def grid_distance_sum(A, n, S, out=None, executor=None, k=None):
+    """Sums up distances from every starting tile to every tile of a grid.
+
+    Runs a single-source :func:`grid_bfs()` per starting tile and adds the distances to
+    an accumulator array in place. Unreachable tiles add nothing to the sum.
+
+    Starting tiles can be split between the workers of an executor, such as
+    :class:`concurrent.futures.ProcessPoolExecutor`. Every worker accumulates the sums of
+    its share of tiles in a local array with :func:`grid_distance_chunk()`, so that only
+    one array per worker is sent back and added to the result.
+
+    Complexity:
+        :math:`O(pmn)` where :math:`p` is the number of starting tiles, divided between
+        the workers.
+
+    :param bytes A: Grid passability map.
+    :param int n: Horizontal size of a grid.
+    :param list S: Coordinates :math:`(y, x)` of starting tiles.
+    :param array out: (optional) Accumulator array indexed by tile index, updated in
+     place. New zero-filled array is allocated by default.
+    :param concurrent.futures.Executor executor: (optional) Executor to run the searches on.
+    :param int k: (optional) Number of groups the starting tiles are split into for the
+     executor. Defaults to the number of processors.
+    :return: Accumulator array.
+
+    """
+    if out is None:
+        out = array('q', [0]) * len(A)
+    if executor is None:
+        R = [grid_distance_chunk(A, n, S)]
+    else:
+        k = k or os.cpu_count() or 1
+        R = executor.map(grid_distance_chunk, [A] * k, [n] * k, [S[i::k] for i in range(k)])
+    for r in R:
+        for i in range(len(out)):
+            out[i] += r[i]
+    return out
+
+
 """
 Constants and subroutines used in graph search
 """
-WHITE = "WHITE"  # Unvisited
-GRAY = "GRAY"  # Discovered
-BLACK = "BLACK"  # Visited
+WHITE = 0  # Unvisited
+GRAY = 1  # Discovered
+BLACK = 2  # Visited
 inf = float("inf")
 
 
-def dfs_visit(G, u, t):
+def grid_mask(M, blocked="X"):
+    """Builds a flat passability map of a grid.
+
+    Complexity:
+        :math:`O(mn)`.
+
+    :param list[list[str]] M: Grid of tiles.
+    :param str blocked: Tile value of impassable tiles.
+    :return: Flat map with :math:`1` for passable tiles and :math:`0` for impassable
+     tiles, row by row.
+
+    """
+    return bytes(0 if c == blocked else 1 for row in M for c in row)
+
+
+def grid_distance_chunk(A, n, S):
+    """Sums up distances from a group of starting tiles to every tile of a grid.
+
+    Complexity:
+        :math:`O(pmn)` where :math:`p` is the number of starting tiles.
+
+    :param bytes A: Grid passability map.
+    :param int n: Horizontal size of a grid.
+    :param list S: Coordinates :math:`(y, x)` of starting tiles.
+    :return: Array of distance sums indexed by tile index.
+
+    """
+    out = array('q', [0]) * len(A)
+    for s in S:
+        d = grid_bfs(A, n, [s])
+        for i in range(len(out)):
+            if d[i] > 0:
+                out[i] += d[i]
+    return out
+
+
+def dfs_visit(G, u, t, f=None):
     """DFS vertex visit procedure.
 
+    Recursive visit of every discovered vertex is replaced with an explicit stack of
+    vertices paired with iterators over their adjacent vertices. A vertex is pushed when it
+    is discovered and popped when its adjacency is exhausted, so discovery and finishing
+    times are the same as those of the recursive version, while the depth of the search is
+    not limited by the interpreter's recursion limit.
+
     Complexity:
-        :math:`O(d)` where :math:`d` is a degree of the vertex.
+        :math:`O(k)` where :math:`k` is the number of vertices and edges reachable from
+        :math:`u`, with :math:`O(k)` space for the stack.
 
     :param Graph G: Graph to search.
     :param Vertex u: Vertex to visit.
     :param Counter t: Distance ticker.
+    :param (Vertex)->Any f: (optional) Procedure called on a vertex once it is finished.
 
     """
     t.tick += 1
     u.d = t.tick  # save discovery time of vertex `u`
     u.color = GRAY  # mark discovered
-    for v in G.Adj(u):  # Explore `u`'s edges
-        if v.color is WHITE:
-            v.p = u  # save pointer to parent
-            dfs_visit(G, v, t)  # Recursively visit adjacent vertex
-    u.color = BLACK  # vertex is finished
-    t.tick += 1
-    u.f = t.tick  # Saving finishing time of vertex `u`
+    S = [(u, G.Adj(u))]  # Stack of discovered vertices and their unexplored edges
+    while len(S) > 0:
+        x, A = S[-1]
+        for v in A:  # Explore `x`'s edges
+            if v.color == WHITE:
+                v.p = x  # save pointer to parent
+                t.tick += 1
+                v.d = t.tick  # save discovery time of vertex `v`
+                v.color = GRAY
+                S.append((v, G.Adj(v)))  # Continue with adjacent vertex
+                break
+        else:
+            S.pop()
+            x.color = BLACK  # vertex is finished
+            t.tick += 1
+            x.f = t.tick  # Saving finishing time of vertex `x`
+            if f is not None:
+                f(x)
@@ -23,9 +23,10 @@ the shortest route it would take to reach the destination vertex.
 
 Algorithms in this module cover solutions to a **single-source shortest paths** problem.
 They share the steps of initialization, edge relaxation and shortest-path estimation.
-Other powerful method worth mentioning is a *bidirectional search*.
+Other powerful methods worth mentioning are *bidirectional search* and goal-directed *A\**
+search, which answer single-pair queries.
 """
-from heapq import heappop
+from heapq import heappush, heappop
 
 from graphs import Graph, Vertex, weight
 from graphs.topological_sort import topological_sort
@@ -54,8 +55,7 @@ def dag_shortest_paths(G, s):
     """
     L = topological_sort(G)
     initialize_single_source(G, s)
-    for node in L:
-        u = node.key  # Gets vertex from a linked list
+    for u in L:
         for v in G.Adj(u):
             relax(u, v)
 
@@ -72,6 +72,11 @@ def bellman_ford(G, s):
     edges, unless there's a negative-weight cycle. The second loop checks for cycles
     by verifying that none of the edges can be further relaxed.
 
+    If a pass makes no changes, estimates are already final and the remaining passes
+    would not change them either, so the algorithm terminates early. On many graphs the
+    number of passes is close to the number of edges on the longest shortest path rather
+    than :math:`|V|-1`. Edges and their weights are listed once before the first pass.
+
     Complexity:
         :math:`O(VE)` for main loop. Initialization and cycle check are :math:`O(V) + O(E)`.
 
@@ -83,18 +88,25 @@ def bellman_ford(G, s):
     """
     n = len(G.V)  # Total number of vertices in a graph
     initialize_single_source(G, s)
+    E = [(u, v, weight(u, v)) for u, v in G.E()]
     for i in range(0, n - 1):
-        # Relax every edge `|V|-1` times
-        for u, v in G.E():
-            relax(u, v)
-    for u, v in G.E():
+        # Relax every edge at most `|V|-1` times
+        changed = False
+        for u, v, w in E:
+            if v.d > u.d + w:
+                v.d = u.d + w
+                v.p = u
+                changed = True
+        if not changed:
+            return True  # No further relaxation is possible
+    for u, v, w in E:
         # Check if an edge cannot be further relaxed
-        if v.d > u.d + weight(u, v):
+        if v.d > u.d + w:
             return False
     return True
 
 
-def dijkstra(G, s):
+def dijkstra(G, s, t=None):
     """Dijkstra single-source shortest-paths algorithm.
 
     In contrast to Bellman-Ford, Dijkstra's algorithm uses greedy strategy on solving the
@@ -104,32 +116,220 @@ def dijkstra(G, s):
 
     Greedy approach does not always yield optimal results, but Dijkstra algorithm does
     indeed compute shortest paths. Each time a vertex :math:`u` is added to the set
-    :math:`S`, :math:`u.d` attribute is already :math:`\delta (s,u)` (completely relaxed).
+    :math:`S`, its estimate is already :math:`\delta (s,u)` (completely relaxed).
 
     Dijkstra algorithm is easy to modify to solve a single-source single-target problem.
-    We only need to stop the loop once the target vertex is found.
+    We only need to stop the loop once the target vertex :math:`t` is settled.
 
-    This implementation uses a priority queue (min-heap) to sort the vertices by their
-    :math:`d` values.
+    This implementation does not initialize or mutate vertex attributes. Estimates and
+    predecessors are kept in a :class:`ShortestPaths` record that only holds the vertices
+    reached by the search, so that a query costs time proportional to the explored region
+    rather than to the size of the graph. Priority queue uses **lazy deletion**: instead of
+    decreasing the key of a queued vertex, a relaxed vertex is pushed again, and outdated
+    entries are skipped once popped.
 
     Complexity:
-        :math:`O(E \log V)`. There are at most :math:`|\\textrm{reachable } E|` relax
-        operations. If we manage to maintain heap properties after each relaxation it is
-        possible to keep :func:`min_heap_extract()` operation at :math:`\log V` time.
-        :math:`O(V\lg V+E)` running time is achievable with a Fibonacci heap.
+        :math:`O(E \log E)` where :math:`E` is the number of edges reachable before the
+        target is settled. There are at most :math:`|\\textrm{reachable } E|` relax
+        operations and as many queue entries. :math:`O(V\lg V+E)` running time is
+        achievable with a Fibonacci heap.
 
     :param Graph G: Weighted directed graph with non-negative weights.
     :param Vertex s: Starting vertex.
+    :param Vertex t: (optional) Target vertex. The search stops as soon as the target is
+     settled.
+    :return: :data:`ShortestPaths` record. Estimates of vertices that were reached, but not
+     settled before the search stopped, are only upper bounds.
 
     """
-    initialize_single_source(G, s)
-    S = []  # Set of vertices whose final shortest-path weights have been calculated
-    Q = G.V.copy()  # Queue all vertices
+    R = ShortestPaths(s)
+    R.d[s] = 0
+    R.p[s] = None
+    S = R.S  # Set of vertices whose final shortest-path weights have been calculated
+    Q = [(0, 0, s)]  # Entries are ordered by estimate and insertion counter
+    c = 1
     while len(Q) > 0:
-        u = heappop(Q)
-        S.append(u)
+        du, _, u = heappop(Q)
+        if u in S:
+            continue  # Outdated queue entry
+        S.add(u)
+        if u is t:
+            break
         for v in G.Adj(u):
-            relax(u, v)
+            dv = du + weight(u, v)
+            if dv < R.d.get(v, inf):
+                R.d[v] = dv
+                R.p[v] = u
+                heappush(Q, (dv, c, v))
+                c += 1
+    return R
+
+
+def bidirectional_dijkstra(G, s, t):
+    """Bidirectional Dijkstra single-pair shortest-path algorithm.
+
+    Two Dijkstra searches run at the same time: a forward search from the starting vertex
+    and a backward search from the target vertex along reversed edges, see
+    :meth:`Graph.RAdj()`. Each step advances the search whose queue has a smaller top
+    estimate. Whenever an edge connects the vertex scanned by one search with the vertex
+    already reached by the other one, a candidate path weight :math:`\mu` is updated.
+
+    The search can stop as soon as the sum of the top estimates of both queues is not
+    less than :math:`\mu`, since no shorter path can be found beyond that point. The two
+    frontiers meet roughly halfway, so that each search only explores a ball of half the
+    radius around its source.
+
+    Complexity:
+        :math:`O(E \log E)` in the worst case, same as :func:`dijkstra()`.
+
+    :param Graph G: Weighted directed graph with non-negative weights.
+    :param Vertex s: Starting vertex.
+    :param Vertex t: Target vertex.
+    :return: :data:`ShortestPaths` record of the forward search, which is extended with the
+     shortest path from the meeting vertex to the target. Settled vertices of both searches
+     are included in a set of settled vertices.
+
+    """
+    F, B = ShortestPaths(s), ShortestPaths(t)  # Forward and backward searches
+    F.d[s], F.p[s] = 0, None
+    B.d[t], B.p[t] = 0, None
+    Qf, Qb = [(0, 0, s)], [(0, 0, t)]
+    c = 1
+    mu, x = (0, s) if s is t else (inf, None)  # Best path weight and the meeting vertex
+    while len(Qf) > 0 and len(Qb) > 0:
+        while len(Qf) > 0 and Qf[0][2] in F.S:
+            heappop(Qf)  # Drop outdated queue entries
+        while len(Qb) > 0 and Qb[0][2] in B.S:
+            heappop(Qb)
+        if len(Qf) == 0 or len(Qb) == 0 or Qf[0][0] + Qb[0][0] >= mu:
+            break
+        forward = Qf[0][0] <= Qb[0][0]
+        R, Q, O = (F, Qf, B) if forward else (B, Qb, F)
+        du, _, u = heappop(Q)
+        R.S.add(u)
+        for v in (G.Adj(u) if forward else G.RAdj(u)):
+            dv = du + (weight(u, v) if forward else weight(v, u))
+            if dv < R.d.get(v, inf):
+                R.d[v] = dv
+                R.p[v] = u
+                heappush(Q, (dv, c, v))
+                c += 1
+            if v in O.d and dv + O.d[v] < mu:
+                mu, x = dv + O.d[v], v
+    if x is not None:  # Attach the backward path from the meeting vertex to the target
+        u, v = x, B.p[x]
+        while v is not None:
+            F.d[v] = F.d[u] + weight(u, v)
+            F.p[v] = u
+            u, v = v, B.p[v]
+    F.S |= B.S
+    return F
+
+
+def astar(G, s, t, h):
+    """A* single-pair shortest-path algorithm.
+
+    A* is a goal-directed variant of Dijkstra's algorithm. Function :math:`h` gives a
+    lower-bound estimate of the distance from a vertex to the target. Vertices are
+    prioritised by the estimate of the whole path :math:`d(v) + h(v)`, so that the search
+    is drawn towards the target instead of spreading uniformly in all directions.
+
+    In terms of the vertex potentials, see :func:`graphs.potential()`, A* is exactly
+    Dijkstra's algorithm running with a potential :math:`h` on top of the potentials of the
+    graph: reduced weight :math:`w(u, v) - h(u) + h(v)` shifts every path estimate by
+    :math:`h(v) - h(s)`. Heuristic must be **consistent**, that is
+    :math:`h(u) ≤ w(u, v) + h(v)` for every edge, so that the reduced weights are
+    non-negative and settled vertices are final.
+
+    Complexity:
+        :math:`O(E \log E)` in the worst case, same as :func:`dijkstra()`. With
+        :math:`h = 0` the algorithm is identical to Dijkstra's.
+
+    :param Graph G: Weighted directed graph with non-negative weights.
+    :param Vertex s: Starting vertex.
+    :param Vertex t: Target vertex.
+    :param (Vertex)->float h: Consistent heuristic estimate of a distance to the target.
+    :return: :data:`ShortestPaths` record with actual path weights.
+
+    """
+    R = ShortestPaths(s)
+    R.d[s] = 0
+    R.p[s] = None
+    Q = [(h(s), 0, s)]
+    c = 1
+    while len(Q) > 0:
+        _, _, u = heappop(Q)
+        if u in R.S:
+            continue  # Outdated queue entry
+        R.S.add(u)
+        if u is t:
+            break
+        du = R.d[u]
+        for v in G.Adj(u):
+            dv = du + weight(u, v)
+            if dv < R.d.get(v, inf):
+                R.d[v] = dv
+                R.p[v] = u
+                heappush(Q, (dv + h(v), c, v))
+                c += 1
+    return R
+
+
+class ShortestPaths:
+    """Result of a single-source shortest-paths search.
+
+    Holds shortest-path estimates and predecessors of reached vertices keyed by vertex,
+    and the set of settled vertices.
+    """
+
+    def __init__(self, s):
+        """Result of a single-source shortest-paths search.
+
+        :param Vertex s: Starting vertex.
+
+        """
+        self.s = s
+        self.d = {}  # Shortest-path estimates keyed by vertex
+        self.p = {}  # Predecessors keyed by vertex
+        self.S = set()  # Settled vertices
+
+
+def distance(R, v):
+    """Returns the shortest-path estimate of a vertex.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param ShortestPaths R: Search result.
+    :param Vertex v: Target vertex.
+    :return: Path weight, or infinity if the vertex was not reached.
+
+    """
+    return R.d.get(v, inf)
+
+
+def path(R, v):
+    """Returns the shortest path to a vertex.
+
+    The path is restored by following predecessor records back to the starting vertex.
+
+    Complexity:
+        :math:`O(k)` where :math:`k` is the number of edges in a path.
+
+    :param ShortestPaths R: Search result.
+    :param Vertex v: Target vertex.
+    :return: List of vertices from the starting vertex to :math:`v`, or :data:`None` if
+     the vertex was not reached.
+
+    """
+    if v not in R.p:
+        return None
+    P = []
+    while v is not None:
+        P.append(v)
+        v = R.p[v]
+    P.reverse()
+    return P
 
 
 """
@@ -188,9 +388,13 @@ def relax(u, v):
 
     :param Vertex u: Source vertex.
     :param Vertex v: Adjacent target vertex.
+    :return: :data:`True` if the estimate of :math:`v` was improved, :data:`False`
+     otherwise.
 
     """
     w = weight(u, v)
     if v.d > u.d + w:
         v.d = u.d + w
         v.p = u
+        return True
+    return False
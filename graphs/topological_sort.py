@@ -2,10 +2,10 @@
 Topological Sort
 ================
 """
-from basic.linked_list import LinkedList, Node as Node
-from basic.linked_list import list_insert
-from graphs import Graph, Vertex
-from graphs.search import Counter, WHITE, GRAY, BLACK
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from graphs import Graph, Vertex, in_degree
+from graphs.search import Counter, WHITE, dfs_visit
 
 
 def topological_sort(G):
@@ -17,8 +17,9 @@ def topological_sort(G):
     possible.
 
     Topological sort is a simple extension of a depth-first search algorithm. The code is
-    almost identical to that of the DFS with the addition of the output linked list. An
-    explored vertex is added to an output list.
+    almost identical to that of the DFS with the addition of the output list. An explored
+    vertex is appended to an output list, and the list is reversed once the search is
+    finished, so that the vertices are ordered by decreasing finishing times.
 
     Complexity:
         :math:`O(V+E)` same as DFS, with :math:`O(V)` additional storage for the output list.
@@ -28,16 +29,102 @@ def topological_sort(G):
 
     """
     t = Counter()
-    L = LinkedList()
+    L = []
     for u in G.V:
         u.color = WHITE
         u.p = None
     for u in G.V:
-        if u.color is WHITE:
+        if u.color == WHITE:
             visit(G, u, t, L)
+    L.reverse()
     return L
 
 
+def topological_waves(G):
+    """Kahn's topological sort of a directed acyclic graph split into waves.
+
+    Kahn's algorithm repeatedly removes vertices that have no incoming edges. Instead of a
+    single queue, this variant processes vertices level by level. First wave consists of
+    all vertices with zero in-degree. Removing a wave decreases the in-degrees of its
+    successors, and those that drop to zero form the next wave. Vertices within a wave do
+    not depend on each other and can be processed concurrently, while the number of waves
+    equals the number of vertices on the longest path.
+
+    Complexity:
+        :math:`O(V+E)`. Every edge decreases an in-degree exactly once.
+
+    :param Graph G: DAG.
+    :return: Next list of vertices that only depend on vertices of the previous waves.
+
+    """
+    d = in_degrees(G)
+    W = [u for u in G.V if d[u.key] == 0]
+    k = 0  # Number of vertices in all waves
+    while len(W) > 0:
+        yield W
+        k += len(W)
+        N = []
+        for u in W:
+            for v in G.Adj(u):
+                d[v.key] -= 1
+                if d[v.key] == 0:
+                    N.append(v)
+        W = N
+    if k < len(G.V):
+        raise ValueError("Graph contains a cycle")
+
+
+def parallel_schedule(G, f, executor=None):
+    """Runs a procedure on every vertex of a DAG in parallel, respecting dependencies.
+
+    Procedure is called with a vertex key, once it was completed for all the preceding
+    vertices. Like in :func:`topological_waves()`, in-degrees are counted down as the
+    procedure completes, but a dependent vertex is submitted to the executor as soon as
+    its last input is finished, without waiting for the rest of the wave.
+
+    Executor can be a :class:`concurrent.futures.ThreadPoolExecutor` or a
+    :class:`concurrent.futures.ProcessPoolExecutor`. In the latter case the procedure,
+    vertex keys and the results must be picklable. If the procedure raises an exception,
+    pending calls are cancelled and the exception is re-raised.
+
+    Complexity:
+        :math:`O(V+E)` of scheduling overhead in addition to the procedure calls.
+
+    :param Graph G: DAG.
+    :param (object)->Any f: Procedure applied to a vertex key.
+    :param concurrent.futures.Executor executor: (optional) Executor to run the procedure
+     on. Thread pool with default number of workers is used by default.
+    :return: Dictionary of procedure results keyed by vertex key.
+
+    """
+    if executor is None:
+        with ThreadPoolExecutor() as executor:
+            return parallel_schedule(G, f, executor)
+    d = in_degrees(G)
+    out = {}
+    F = {}  # Pending vertices keyed by their futures
+    for u in G.V:
+        if d[u.key] == 0:
+            F[executor.submit(f, u.key)] = u
+    while len(F) > 0:
+        done, _ = wait(F, return_when=FIRST_COMPLETED)
+        for x in done:
+            u = F.pop(x)
+            try:
+                out[u.key] = x.result()
+            except BaseException:
+                for y in F:
+                    y.cancel()
+                raise
+            for v in G.Adj(u):  # Release dependents whose inputs are finished
+                d[v.key] -= 1
+                if d[v.key] == 0:
+                    F[executor.submit(f, v.key)] = v
+    if len(out) < len(G.V):
+        raise ValueError("Graph contains a cycle")
+    return out
+
+
 """
 Subroutines used in topological sort
 """
@@ -46,26 +133,38 @@ Subroutines used in topological sort
 def visit(G, u, t, L):
     """Vertex visit procedure for topological sort.
 
-    The code is almost identical to the :func:`dfs_visit()` procedure with a simple addition
-    of :func:`list_insert()`.
+    The procedure is a :func:`dfs_visit()` that appends every finished vertex to the
+    output list.
 
     Complexity:
-        :math:`O(k)` where :math:`k` is number of adjacent vertices.
+        :math:`O(k)` where :math:`k` is the number of vertices and edges reachable from
+        :math:`u`.
 
     :param Graph G: DAG.
     :param Vertex u: Vertex to visit.
     :param Counter t: Distance ticker.
-    :param LinkedList L: Output list.
+    :param list L: Output list of vertices in order of their finishing times.
 
     """
-    t.tick += 1
-    u.d = t.tick
-    u.color = GRAY
-    for v in G.Adj(u):
-        if v.color is WHITE:
-            v.p = u
-            visit(G, v, t, L)
-    u.color = BLACK
-    t.tick += 1
-    u.f = t.tick
-    list_insert(L, Node(u))  # Finished vertex is added onto the front of a linked list
+    dfs_visit(G, u, t, L.append)
+
+
+def in_degrees(G):
+    """Counts incoming edges of every vertex.
+
+    If reverse edges index of a graph is built, in-degrees are taken from it.
+
+    Complexity:
+        :math:`O(V+E)`, :math:`O(V)` with reverse edges index.
+
+    :param Graph G: A graph.
+    :return: Dictionary of in-degrees keyed by vertex key.
+
+    """
+    if G.r_edges is not None:
+        return {u.key: in_degree(G, u) for u in G.V}
+    d = {u.key: 0 for u in G.V}
+    for u in G.V:
+        for k in u.f_edges:
+            d[k] += 1
+    return d
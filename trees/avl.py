@@ -15,7 +15,7 @@ dynamic set, such as insertion and deletion of a node. Balanced tree structure g
 """
 from trees.bst import BST, Node as BSTNode
 from trees.bst import right_rotate, left_rotate
-from trees.bst import tree_insert, tree_delete
+from trees.bst import tree_insert, tree_delete, tree_minimum
 
 
 class AVLTree(BST):
@@ -29,6 +29,7 @@ class Node(BSTNode):
 
     Height attribute in every node in helps to reduce the number of height computations.
     """
+    __slots__ = ("height",)
 
     def __init__(self, key):
         """Augmented BST node with additional height attribute.
@@ -91,7 +92,7 @@ def balance_factor(x):
     return height(x.left) - height(x.right)
 
 
-def avl_rebalance(T, x):
+def avl_rebalance(T, x, update=update_height):
     """Recursive AVL rebalancing operation.
 
     This algorithm implicitly assumes that AVL properties are maintained for nodes below
@@ -103,38 +104,44 @@ def avl_rebalance(T, x):
     comments are added to the code, describing these cases. The height attributes of all
     traversed nodes are updated in the process.
 
+    Node attributes are updated with a procedure that can be replaced to maintain further
+    augmentations. It is called bottom-up on every node whose children have changed, once
+    their own attributes are correct.
+
     Complexity:
         :math:`O(\log n)`. Rotations take :math:`O(1)` time.
 
     :param AVLTree T: Instance of an AVL tree.
     :param trees.avl.Node x: Node to adjust.
+    :param (trees.avl.Node)->Any update: (optional) Procedure that updates the attributes
+     of a node from its children. Must update the height.
 
     """
     if x is not None:
-        update_height(x)
+        update(x)
         f = balance_factor(x)
         if f < -1:  # `x`'s right subtree is "heavier"
             a = x.right
-            if height(a.left) >= height(a.right):  # Right successors form a "zig-zag"
+            if height(a.left) > height(a.right):  # Right successors form a "zig-zag"
                 right_rotate(T, a)
-                update_height(a)
+                update(a)
                 left_rotate(T, x)
             else:
                 left_rotate(T, x)
-            update_height(x)
+            update(x)
         elif f > 1:  # `x`'s left subtree is "heavier"
             b = x.left
-            if height(b.right) >= height(b.left):  # Left successors form a "zig-zag"
+            if height(b.right) > height(b.left):  # Left successors form a "zig-zag"
                 left_rotate(T, b)
-                update_height(b)
+                update(b)
                 right_rotate(T, x)
             else:
                 right_rotate(T, x)
-            update_height(x)
-        avl_rebalance(T, x.p)  # Recursive call
+            update(x)
+        avl_rebalance(T, x.p, update)  # Recursive call
 
 
-def avl_insert(T, z):
+def avl_insert(T, z, update=update_height):
     """Inserts a new node into AVL tree.
 
     Rebalances :math:`z`'s children and parent nodes above :math:`z` if they disobey AVL
@@ -146,24 +153,37 @@ def avl_insert(T, z):
 
     :param AVLTree T: Instance of an AVL tree.
     :param trees.avl.Node z: Node to insert.
+    :param (trees.avl.Node)->Any update: (optional) Node update procedure, see
+     :func:`avl_rebalance()`.
 
     """
     tree_insert(T, z)
-    avl_rebalance(T, z)
+    avl_rebalance(T, z, update)
 
 
-def avl_delete(T, z):
+def avl_delete(T, z, update=update_height):
     """Removes a node from AVL tree.
 
     Node is deleted in such a way so that AVL tree properties continue to hold.
 
+    Rebalancing starts from the lowest node whose subtree has changed. It is the parent of
+    :math:`z` if :math:`z` has at most one child. Otherwise :math:`z`'s successor takes
+    its place, and the lowest changed node is the successor's former parent, or the
+    successor itself if it was :math:`z`'s right child.
+
     Complexity:
         :math:`O(\log n)`, same as :func:`avl_insert()`.
 
     :param AVLTree T: Instance of an AVL tree to update.
     :param trees.avl.Node z: Node to remove.
+    :param (trees.avl.Node)->Any update: (optional) Node update procedure, see
+     :func:`avl_rebalance()`.
 
     """
-    p = z.p
+    if z.left is None or z.right is None:
+        p = z.p
+    else:
+        y = tree_minimum(z.right)  # `z`'s successor
+        p = y if y.p is z else y.p
     tree_delete(T, z)
-    avl_rebalance(T, p)  # first node that is potentially out of balance is the parent.
+    avl_rebalance(T, p, update)  # first node that is potentially out of balance
@@ -0,0 +1,767 @@
+"""
+B+ Tree
+=======
+
+B+ tree is a variant of a B-tree, see :mod:`trees.b_tree`, which keeps all the keys and
+their values in the **leaves**. Internal nodes only hold **separator keys** that guide the
+search: child :math:`c_i` of an internal node holds the keys :math:`k` such that
+:math:`key_{i-1} ≤ k < key_i`. Leaves are linked into a list in key order, so that a
+**range scan** finds its first key with a single descent and then just follows the links.
+
+Every node, except the root, holds between :math:`\\lfloor(m-1)/2\\rfloor` and :math:`m-1`
+keys, where :math:`m` is the **order** of a tree, the maximal number of children of an
+internal node. An overfull node is **split** in two, which adds a separator to its parent.
+An underfull node either **borrows** a key from a sibling that has keys to spare, which is
+called redistribution, or is **merged** with a sibling, which removes a separator from its
+parent. Splits and merges may propagate up to the root, which is the only way the height
+of a tree changes, so all leaves are always at the same depth.
+
+Nodes refer to each other by page ids rather than by pointers, and are read and written
+through a **page store**. :class:`MemoryStore` keeps nodes in a dictionary, while
+:class:`PageFile` keeps them in fixed-size pages of a file and caches recently used nodes
+in an LRU buffer pool, so that a tree may be larger than the available memory. Tree
+operations call :meth:`write` on every node they modify; this is where the
+``disk_write`` placeholders of :mod:`trees.b_tree` would go.
+
+Store may refuse to write a node, as :class:`PageFile` does with a node that does not fit
+into a page. In that case an insertion is rolled back and raises :class:`ValueError`, and
+a deletion leaves the node underfull instead of merging or borrowing, so the tree stays
+consistent.
+"""
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+class BPlusTree:
+    """A B-tree variant that stores all the keys in linked leaves.
+    """
+
+    def __init__(self, order=64, store=None):
+        """A B-tree variant that stores all the keys in linked leaves.
+
+        If the store already holds a tree, the tree is opened with its original order.
+
+        With a :class:`PageFile` store a node of :math:`m-1` keys and values must fit into
+        a page, which limits the size of an encoded key and value to roughly
+        :math:`size/m` bytes, that is 256 bytes with the default order and page size.
+        Encoding adds 5 bytes to every string, byte string and integer. Larger entries
+        need a smaller order or a larger page size.
+
+        :param int order: (optional) Maximal number of children of a node, at least 3.
+        :param store: (optional) Page store. New :class:`MemoryStore` is used by default.
+
+        """
+        self.store = MemoryStore() if store is None else store
+        if self.store.meta is None:
+            if order < 3:
+                raise ValueError("Order must be at least 3")
+            self.order = order
+            self.n = 0  # Number of keys
+            x = Node(self.store.allocate(), True)
+            self.store.write(x)
+            self.root = x.id
+            write_meta(self)
+        else:
+            self.root, self.order, self.n = self.store.meta
+
+
+class Node:
+    """Node of a B+ tree.
+
+    Leaf holds sorted keys, their values and the page id of the next leaf. Internal node
+    holds :math:`n` sorted separator keys and page ids of its :math:`n+1` children.
+    """
+    __slots__ = ("id", "leaf", "keys", "c", "next")
+
+    def __init__(self, i, leaf):
+        """Node of a B+ tree.
+
+        :param int i: Page id of a node.
+        :param bool leaf: Denotes if the node is a leaf node.
+
+        """
+        self.id = i
+        self.leaf = leaf
+        self.keys = []
+        self.c = []  # Values of a leaf or page ids of children of an internal node
+        self.next = -1  # Page id of the next leaf
+
+
+class MemoryStore:
+    """Page store that keeps nodes in memory.
+    """
+
+    def __init__(self):
+        """Page store that keeps nodes in memory.
+        """
+        self.pages = {}  # Nodes keyed by page id
+        self.free_ids = []  # Page ids of freed pages
+        self.n = 0  # Number of allocated page ids
+        self.meta = None  # Tree metadata
+
+    def allocate(self):
+        """Returns an unused page id.
+        """
+        if len(self.free_ids) > 0:
+            return self.free_ids.pop()
+        self.n += 1
+        return self.n - 1
+
+    def read(self, i):
+        """Returns a node stored in a page.
+
+        :param int i: Page id.
+        :return: :data:`Node` object.
+
+        """
+        return self.pages[i]
+
+    def write(self, x):
+        """Stores a node in its page.
+
+        :param Node x: Node to store.
+
+        """
+        self.pages[x.id] = x
+
+    def free(self, i):
+        """Releases a page, so that its id can be reused.
+
+        :param int i: Page id.
+
+        """
+        self.pages.pop(i, None)
+        self.free_ids.append(i)
+
+    def flush(self):
+        """Does nothing, since there is nothing to persist.
+        """
+        pass
+
+
+class PageFile:
+    """Page store that keeps nodes in fixed-size pages of a file.
+
+    Page :math:`i` starts at byte :math:`i \\cdot size`. First page is a header with the
+    page size, the number of pages, the first free page and the tree metadata. Every other
+    page starts with the kind of a page, the number of keys and the id of the next leaf or
+    of the next free page. It is followed by page ids of children of an internal node, and
+    by keys and values. Freed pages form a linked list and are reused before the file
+    grows.
+
+    Keys and values are encoded as tagged fields: :data:`None`, integers, floats, strings
+    and byte strings are supported, and other types are refused with
+    :class:`ValueError`. No objects are unpickled when a file is read, so opening a file
+    from an untrusted source cannot run code, but a tampered file may still hold a
+    malformed tree.
+
+    Recently used nodes are kept in a buffer pool in LRU order. Written nodes are
+    serialized and marked dirty, and only reach the file when they are evicted from the
+    pool or on :meth:`flush`, so a hot node is written to the file once no matter how
+    often it changes. A node is serialized as soon as it is written, and a node that does
+    not fit into a page is refused with :class:`ValueError` right away, so that the error
+    is raised by the tree operation that made the node too large. Page size limits the size
+    of tree entries, see :class:`BPlusTree`.
+    """
+
+    def __init__(self, path, page_size=16384, pool_size=256):
+        """Page store that keeps nodes in fixed-size pages of a file.
+
+        :param str path: File path. Existing file is opened with its own page size.
+        :param int page_size: (optional) Page size in bytes for a new file.
+        :param int pool_size: (optional) Number of nodes in a buffer pool.
+
+        """
+        if pool_size < 1:
+            raise ValueError("Buffer pool must hold at least one node")
+        if page_size < struct.calcsize(HEADER):
+            raise ValueError("Page size is too small")
+        self.pool = OrderedDict()  # Nodes keyed by page id, least recently used first
+        self.dirty = {}  # Serialized nodes that differ from the file, keyed by page id
+        self.pool_size = pool_size
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.f = open(path, "r+b")
+            B = self.f.read(struct.calcsize(HEADER))
+            if len(B) < struct.calcsize(HEADER) or B[:len(MAGIC)] != MAGIC:
+                raise ValueError("Not a B+ tree page file")
+            _, self.page_size, self.n, self.free_head, m, root, order, n = \
+                struct.unpack(HEADER, B)
+            self.meta = (root, order, n) if m else None
+        else:
+            self.f = open(path, "w+b")
+            self.page_size = page_size
+            self.n = 1  # Number of pages, including the header
+            self.free_head = -1  # Page id of the first free page
+            self.meta = None
+            self.flush()
+
+    def allocate(self):
+        """Returns an unused page id.
+        """
+        i = self.free_head
+        if i == -1:
+            i = self.n
+            self.n += 1
+        else:
+            self.f.seek(i * self.page_size)
+            B = self.f.read(struct.calcsize(NODE))
+            _, _, self.free_head = struct.unpack(NODE, B)
+        return i
+
+    def read(self, i):
+        """Returns a node stored in a page, reading it from the file if it is not cached.
+
+        :param int i: Page id.
+        :return: :data:`Node` object.
+
+        """
+        x = self.pool.get(i)
+        if x is not None:
+            self.pool.move_to_end(i)
+            return x
+        self.f.seek(i * self.page_size)
+        x = decode_page(i, self.f.read(self.page_size))
+        self.pool[i] = x
+        self.evict()
+        return x
+
+    def write(self, x):
+        """Serializes a node, puts it into the buffer pool and marks it dirty.
+
+        Node that does not fit into a page raises :class:`ValueError`, and the buffer pool
+        is left unchanged.
+
+        :param Node x: Node to store.
+
+        """
+        B = encode_page(self, x)
+        self.pool[x.id] = x
+        self.pool.move_to_end(x.id)
+        self.dirty[x.id] = B
+        self.evict()
+
+    def free(self, i):
+        """Releases a page and adds it to the free list.
+
+        :param int i: Page id.
+
+        """
+        self.pool.pop(i, None)
+        self.dirty.pop(i, None)
+        self.f.seek(i * self.page_size)
+        self.f.write(struct.pack(NODE, FREE_PAGE, 0, self.free_head))
+        self.free_head = i
+
+    def evict(self):
+        """Evicts least recently used nodes until the buffer pool fits its size.
+        """
+        while len(self.pool) > self.pool_size:
+            i = next(iter(self.pool))
+            if i in self.dirty:
+                write_page(self, i, self.dirty[i])
+                del self.dirty[i]  # Node leaves the pool only after it is written
+            del self.pool[i]
+
+    def flush(self):
+        """Writes all dirty nodes and then the header to the file.
+
+        A node stays dirty until its page is written, so if a write fails, the flush can
+        be retried once the cause is fixed.
+        """
+        for i in sorted(self.dirty):
+            write_page(self, i, self.dirty[i])
+            del self.dirty[i]
+        M = (0, 0, 0) if self.meta is None else self.meta
+        H = struct.pack(HEADER, MAGIC, self.page_size, self.n, self.free_head,
+                        self.meta is not None, *M)
+        self.f.seek(0)
+        self.f.write(H)
+        self.f.flush()
+
+    def close(self):
+        """Flushes and closes the file.
+        """
+        self.flush()
+        self.f.close()
+
+
+def bplus_search(T, k, default=None):
+    """Returns a value associated with a key.
+
+    Complexity:
+        :math:`O(\\log n)`, with :math:`O(\\log_m n)` page reads.
+
+    :param BPlusTree T: B+ tree.
+    :param object k: Key to look up.
+    :param object default: (optional) Value to return if a key is not found.
+    :return: Value of a key or the default value.
+
+    """
+    x, _ = descend(T, k)
+    i = bisect_left(x.keys, k)
+    if i < len(x.keys) and x.keys[i] == k:
+        return x.c[i]
+    return default
+
+
+def bplus_insert(T, k, v):
+    """Inserts a key and a value into a B+ tree, or replaces the value of an existing key.
+
+    The key is inserted into its leaf. An overfull leaf is split in half, and the first
+    key of the right half is copied into the parent as a separator. An overfull internal
+    node is split around its middle key, which moves up into the parent. Splits propagate
+    along the path of the descent, and a split of the root adds a new root. If the store
+    refuses to write a node, all nodes on the path are restored and :class:`ValueError` is
+    raised.
+
+    Complexity:
+        :math:`O(m\\log_m n)`, with :math:`O(\\log_m n)` page reads and writes.
+
+    :param BPlusTree T: B+ tree.
+    :param object k: Key.
+    :param object v: Value.
+
+    """
+    S = T.store
+    x, P = descend(T, k)
+    U = snapshot([x] + [p for p, _ in P])  # Nodes to restore if a write is refused
+    i = bisect_left(x.keys, k)
+    if i < len(x.keys) and x.keys[i] == k:
+        x.c[i] = v
+        try:
+            S.write(x)
+        except ValueError:
+            restore(S, U)
+            raise
+        return
+    root, n = T.root, T.n
+    N = []  # Allocated page ids
+    try:
+        x.keys.insert(i, k)
+        x.c.insert(i, v)
+        T.n += 1
+        split_path(T, x, P, N)
+    except ValueError:
+        T.root, T.n = root, n
+        for j in N:
+            S.free(j)
+        restore(S, U)
+        raise
+    write_meta(T)
+
+
+def split_path(T, x, P, N):
+    """Splits overfull nodes on a path of the descent up to the root and writes them.
+
+    :param BPlusTree T: B+ tree.
+    :param Node x: Leaf that got a new key.
+    :param list[tuple] P: Internal nodes on the path from the root and positions of the
+     children the path goes through.
+    :param list[int] N: List to which page ids of new nodes are appended.
+
+    """
+    S = T.store
+    while len(x.keys) > T.order - 1:  # Split an overfull node
+        z = Node(S.allocate(), x.leaf)
+        N.append(z.id)
+        m = len(x.keys) // 2
+        if x.leaf:
+            z.keys, z.c = x.keys[m:], x.c[m:]
+            del x.keys[m:], x.c[m:]
+            z.next, x.next = x.next, z.id
+            s = z.keys[0]  # Separator is copied
+        else:
+            s = x.keys[m]  # Separator moves up
+            z.keys, z.c = x.keys[m + 1:], x.c[m + 1:]
+            del x.keys[m:], x.c[m + 1:]
+        S.write(x)
+        S.write(z)
+        if len(P) > 0:
+            p, j = P.pop()
+            p.keys.insert(j, s)
+            p.c.insert(j + 1, z.id)
+            x = p
+        else:  # Root was split
+            x = Node(S.allocate(), False)
+            N.append(x.id)
+            x.keys, x.c = [s], [T.root, z.id]
+            T.root = x.id
+    S.write(x)
+
+
+def bplus_delete(T, k):
+    """Removes a key from a B+ tree.
+
+    The key is removed from its leaf. An underfull node borrows a key from its left or
+    right sibling if that sibling has more than the minimal number of keys, and the
+    separator in the parent is updated. Otherwise the node is merged with a sibling, and
+    the separator between them is removed from the parent, which may leave the parent
+    underfull in turn. Internal root without keys is replaced with its only child. If the
+    store refuses to write a node that would grow, the node is left underfull.
+
+    Complexity:
+        :math:`O(m\\log_m n)`, with :math:`O(\\log_m n)` page reads and writes.
+
+    :param BPlusTree T: B+ tree.
+    :param object k: Key to remove.
+    :return: Value of a removed key.
+
+    """
+    S = T.store
+    x, P = descend(T, k)
+    i = bisect_left(x.keys, k)
+    if i == len(x.keys) or x.keys[i] != k:
+        raise KeyError(k)
+    v = x.c[i]
+    del x.keys[i], x.c[i]
+    T.n -= 1
+    lo = (T.order - 1) // 2  # Minimal number of keys
+    while len(P) > 0 and len(x.keys) < lo:
+        p, j = P[-1]
+        a = S.read(p.c[j - 1]) if j > 0 else None  # Left sibling
+        b = S.read(p.c[j + 1]) if j < len(p.c) - 1 else None  # Right sibling
+        U = snapshot([y for y in (x, p, a, b) if y is not None])
+        try:
+            rebalance(T, x, p, j, a, b)
+        except ValueError:  # Store refused a node, leave `x` underfull
+            restore(S, U)
+            break
+        P.pop()
+        x = p
+    if len(P) == 0 and not x.leaf and len(x.keys) == 0:  # Root has a single child
+        T.root = x.c[0]
+        S.free(x.id)
+    else:
+        S.write(x)
+    write_meta(T)
+    return v
+
+
+def rebalance(T, x, p, j, a, b):
+    """Fixes an underfull node by borrowing a key from a sibling or merging with it.
+
+    Nodes that grow are written first, so if the store refuses a node, no other node has
+    been changed in the store yet.
+
+    :param BPlusTree T: B+ tree.
+    :param Node x: Underfull node.
+    :param Node p: Parent of the node.
+    :param int j: Position of the node among the children of the parent.
+    :param Node a: Left sibling or :data:`None`.
+    :param Node b: Right sibling or :data:`None`.
+
+    """
+    S = T.store
+    lo = (T.order - 1) // 2
+    if a is not None and len(a.keys) > lo:  # Borrow from the left sibling
+        if x.leaf:
+            x.keys.insert(0, a.keys.pop())
+            x.c.insert(0, a.c.pop())
+            p.keys[j - 1] = x.keys[0]
+        else:
+            x.keys.insert(0, p.keys[j - 1])
+            x.c.insert(0, a.c.pop())
+            p.keys[j - 1] = a.keys.pop()
+        S.write(x)
+        S.write(a)
+    elif b is not None and len(b.keys) > lo:  # Borrow from the right sibling
+        if x.leaf:
+            x.keys.append(b.keys.pop(0))
+            x.c.append(b.c.pop(0))
+            p.keys[j] = b.keys[0]
+        else:
+            x.keys.append(p.keys[j])
+            x.c.append(b.c.pop(0))
+            p.keys[j] = b.keys.pop(0)
+        S.write(x)
+        S.write(b)
+    else:  # Merge with a sibling
+        if a is not None:
+            a, b, j = a, x, j - 1
+        else:
+            a, b = x, b
+        if a.leaf:
+            a.keys += b.keys
+            a.next = b.next
+        else:
+            a.keys += [p.keys[j]] + b.keys
+        a.c += b.c
+        S.write(a)
+        del p.keys[j], p.c[j + 1]
+        S.free(b.id)
+
+
+def bplus_range(T, lo=None, hi=None):
+    """Iterates through keys and values in a half-open range of keys in sorted order.
+
+    A single descent finds the leaf of the lower bound, and the scan follows the leaf
+    links from there. The tree must not be modified during the iteration.
+
+    Complexity:
+        :math:`O(\\log n+k)` where :math:`k` is the number of keys in the range, with
+        :math:`O(\\log_m n+k/m)` page reads.
+
+    :param BPlusTree T: B+ tree.
+    :param object lo: (optional) Lower bound, inclusive. Unbounded by default.
+    :param object hi: (optional) Upper bound, exclusive. Unbounded by default.
+    :return: Next tuple of a key and a value.
+
+    """
+    if lo is None:
+        x = T.store.read(T.root)
+        while not x.leaf:  # Leftmost leaf
+            x = T.store.read(x.c[0])
+        i = 0
+    else:
+        x, _ = descend(T, lo)
+        i = bisect_left(x.keys, lo)
+    while True:
+        while i < len(x.keys):
+            if hi is not None and not x.keys[i] < hi:
+                return
+            yield x.keys[i], x.c[i]
+            i += 1
+        if x.next == -1:
+            return
+        x = T.store.read(x.next)
+        i = 0
+
+
+def bplus_bulk_load(T, A):
+    """Fills an empty B+ tree with sorted keys and values.
+
+    Instead of inserting the keys one by one, the tree is built bottom-up. Keys are split
+    evenly between the smallest possible number of full leaves, which are linked together.
+    Every next level groups the nodes of the level below evenly under the smallest possible
+    number of parents, with the smallest keys of their subtrees as separators, until a
+    single root remains. Even split keeps every node at least half full.
+
+    Complexity:
+        :math:`O(n)`, with :math:`O(n/m)` page writes.
+
+    :param BPlusTree T: Empty B+ tree.
+    :param list[tuple] A: Key-value pairs sorted by strictly increasing keys.
+
+    """
+    if T.n > 0:
+        raise ValueError("Tree is not empty")
+    A = list(A)
+    for i in range(1, len(A)):
+        if not A[i - 1][0] < A[i][0]:
+            raise ValueError("Keys are not strictly increasing")
+    if len(A) == 0:
+        return
+    S = T.store
+    L = []  # Smallest keys and nodes of the current level
+    for lo, hi in even_split(len(A), T.order - 1):
+        x = Node(S.allocate(), True)
+        x.keys = [k for k, _ in A[lo:hi]]
+        x.c = [v for _, v in A[lo:hi]]
+        if len(L) > 0:
+            L[-1][1].next = x.id
+        L.append((x.keys[0], x))
+    while len(L) > 1:
+        for _, x in L:
+            S.write(x)
+        N = []
+        for lo, hi in even_split(len(L), T.order):
+            x = Node(S.allocate(), False)
+            x.keys = [k for k, _ in L[lo + 1:hi]]
+            x.c = [y.id for _, y in L[lo:hi]]
+            N.append((L[lo][0], x))
+        L = N
+    S.write(L[0][1])
+    S.free(T.root)  # Empty leaf
+    T.root = L[0][1].id
+    T.n = len(A)
+    write_meta(T)
+
+
+"""
+Constants and subroutines used in B+ trees
+"""
+MAGIC = b"BPT2"
+# Magic, page size, number of pages, first free page, metadata flag, root page id, order
+# and number of keys
+HEADER = "<4sIqq?qqq"
+NODE = "<BxxxIq"  # Kind of a page, number of keys, next leaf or next free page
+FREE_PAGE, LEAF_PAGE, INTERNAL_PAGE = 0, 1, 2
+FIELD = "<BI"  # Type tag and length of a variable-size field
+NONE_FIELD, INT_FIELD, FLOAT_FIELD, STR_FIELD, BYTES_FIELD = 0, 1, 2, 3, 4
+
+
+def descend(T, k):
+    """Finds a leaf that holds a key.
+
+    Complexity:
+        :math:`O(\\log n)`.
+
+    :param BPlusTree T: B+ tree.
+    :param object k: Key to look up.
+    :return: Tuple of a leaf, and a list of internal nodes on the path from the root with
+     positions of the children the path goes through.
+
+    """
+    P = []
+    x = T.store.read(T.root)
+    while not x.leaf:
+        i = bisect_right(x.keys, k)
+        P.append((x, i))
+        x = T.store.read(x.c[i])
+    return x, P
+
+
+def even_split(n, k):
+    """Splits a range into the smallest number of nearly equal parts of at most k items.
+
+    :param int n: Number of items.
+    :param int k: Maximal size of a part.
+    :return: List of tuples of the first index and the index past the end of every part.
+
+    """
+    p = -(-n // k)  # Number of parts
+    return [(n * i // p, n * (i + 1) // p) for i in range(p)]
+
+
+def write_meta(T):
+    """Saves the root page id, the order and the number of keys of a tree in its store.
+
+    :param BPlusTree T: B+ tree.
+
+    """
+    T.store.meta = (T.root, T.order, T.n)
+
+
+def snapshot(X):
+    """Copies the contents of nodes, so that they can be restored.
+
+    :param list[Node] X: Nodes to copy.
+    :return: List of tuples of a node and copies of its contents.
+
+    """
+    return [(x, x.keys[:], x.c[:], x.next) for x in X]
+
+
+def restore(S, U):
+    """Restores the contents of nodes from a snapshot and writes them back to a store.
+
+    :param S: Page store.
+    :param list[tuple] U: Snapshot made with :func:`snapshot()`.
+
+    """
+    for x, keys, c, nxt in U:
+        x.keys, x.c, x.next = keys, c, nxt
+        S.write(x)
+
+
+def encode_page(F, x):
+    """Serializes a node into the contents of a page.
+
+    :param PageFile F: Page file.
+    :param Node x: Node to serialize.
+    :return: Serialized node.
+
+    """
+    B = [struct.pack(NODE, LEAF_PAGE if x.leaf else INTERNAL_PAGE, len(x.keys), x.next)]
+    if not x.leaf:
+        B.append(struct.pack("<%dq" % len(x.c), *x.c))
+    B += [encode_field(k) for k in x.keys]
+    if x.leaf:
+        B += [encode_field(v) for v in x.c]
+    B = b"".join(B)
+    if len(B) > F.page_size:
+        raise ValueError("Node does not fit into a page")
+    return B
+
+
+def decode_page(i, B):
+    """Deserializes a node from the contents of a page.
+
+    :param int i: Page id.
+    :param bytes B: Page contents made with :func:`encode_page()`.
+    :return: :data:`Node` object.
+
+    """
+    kind, n, nxt = struct.unpack_from(NODE, B)
+    if kind != LEAF_PAGE and kind != INTERNAL_PAGE:
+        raise ValueError("Not a node page")
+    x = Node(i, kind == LEAF_PAGE)
+    x.next = nxt
+    j = struct.calcsize(NODE)
+    if not x.leaf:
+        x.c = list(struct.unpack_from("<%dq" % (n + 1), B, j))
+        j += 8 * (n + 1)
+    for _ in range(n):
+        k, j = decode_field(B, j)
+        x.keys.append(k)
+    if x.leaf:
+        for _ in range(n):
+            v, j = decode_field(B, j)
+            x.c.append(v)
+    return x
+
+
+def encode_field(x):
+    """Encodes a key or a value.
+
+    :param x: :data:`None`, integer, float, string or byte string.
+    :return: Encoded field.
+
+    """
+    t = type(x)
+    if x is None:
+        return struct.pack("<B", NONE_FIELD)
+    if t is float:
+        return struct.pack("<Bd", FLOAT_FIELD, x)
+    if t is int:
+        tag, B = INT_FIELD, x.to_bytes(x.bit_length() // 8 + 1, "little", signed=True)
+    elif t is str:
+        tag, B = STR_FIELD, x.encode("utf-8")
+    elif t is bytes:
+        tag, B = BYTES_FIELD, x
+    else:
+        raise ValueError("Unsupported key or value type")
+    return struct.pack(FIELD, tag, len(B)) + B
+
+
+def decode_field(B, j):
+    """Decodes a key or a value.
+
+    :param bytes B: Page contents.
+    :param int j: Byte offset of a field.
+    :return: Tuple of a key or a value and the byte offset of the next field.
+
+    """
+    tag = B[j]
+    if tag == NONE_FIELD:
+        return None, j + 1
+    if tag == FLOAT_FIELD:
+        return struct.unpack_from("<d", B, j + 1)[0], j + 9
+    _, k = struct.unpack_from(FIELD, B, j)
+    j += struct.calcsize(FIELD)
+    D = B[j:j + k]
+    if len(D) != k:
+        raise ValueError("Malformed page")
+    if tag == INT_FIELD:
+        x = int.from_bytes(D, "little", signed=True)
+    elif tag == STR_FIELD:
+        x = D.decode("utf-8")
+    elif tag == BYTES_FIELD:
+        x = bytes(D)
+    else:
+        raise ValueError("Malformed page")
+    return x, j + k
+
+
+def write_page(F, i, B):
+    """Writes the contents of a page to a file.
+
+    :param PageFile F: Page file.
+    :param int i: Page id.
+    :param bytes B: Page contents made with :func:`encode_page()`.
+
+    """
+    F.f.seek(i * F.page_size)
+    F.f.write(B)
@@ -2,18 +2,33 @@
 B-Tree
 ======
 
+B-tree is a balanced search tree designed to work well on disks and other storage devices
+with slow access to a block of data. Its nodes may have many children, from a few to
+thousands, which makes the height of a tree very small.
+
+Every node, except the root, holds between :math:`t-1` and :math:`2t-1` keys, where
+:math:`t≥2` is the **minimum degree** of a tree. Large degrees also help in memory, where
+a node that spans a few cache lines is scanned faster than the same number of keys spread
+over the nodes of a binary tree. Keys within a node are sorted, so a node is searched with
+a binary search by :mod:`bisect`, and a descent compares :math:`O(\\log n)` keys in total
+regardless of the degree.
 """
-
-t = 2  # Minimum degree of a B-Tree
+from bisect import bisect_left, bisect_right
 
 
 class BTree:
     """A tree data structure in which each node has a large number of children.
     """
 
-    def __init__(self):
+    def __init__(self, t=2):
         """A tree data structure in which each node has a large number of children.
+
+        :param int t: (optional) Minimum degree of a tree, at least 2.
+
         """
+        if t < 2:
+            raise ValueError("Minimum degree must be at least 2")
+        self.t = t
         self.root = None
 
 
@@ -27,7 +42,12 @@ class Node:
 
     """
 
-    def __init__(self):
+    def __init__(self, t):
+        """Node of a B-tree.
+
+        :param int t: Minimum degree of a tree.
+
+        """
         self.n = 0  # Number of keys currently stored in the node
         self.key = [None] * (2 * t - 1)  # List of keys themselves
         self.leaf = False  # Denotes if the node is a leaf node
@@ -39,13 +59,14 @@ def b_tree_search(x, k):
 
     Searching B-tree is much like searching a binary tree, except that instead of making a
     binary branding decision at each node, we make a multiway branching decision according
-    to the number of the node's children.
+    to the number of the node's children. Position of the key in a node is found with a
+    binary search, and the descent is a loop rather than a recursion.
 
     Complexity:
-        :math:`O(th)=O(t\\log_t n)`, where :math:`h` is the height of the B-tree and
+        :math:`O(h\\log t)=O(\\log n)`, where :math:`h` is the height of the B-tree and
         :math:`n` is the number of keys in the B-tree. The procedure accesses
-        :math:`O(h)=O(\\log_t n)` disk pages and spends :math:`O(t)` time on key scanning
-        at each node.
+        :math:`O(h)=O(\\log_t n)` disk pages and spends :math:`O(\\log t)` time on key
+        search at each node.
 
     :param trees.b_tree.Node x: Root node.
     :param object k: Target key.
@@ -53,16 +74,14 @@ def b_tree_search(x, k):
      or :data:`None` if a key was not found in a tree.
 
     """
-    i = 0
-    while i < x.n and k > x.key[i]:
-        i += 1
-    if i < x.n and k == x.key[i]:
-        return x, i
-    if x.leaf:
-        return None
-    else:
+    while True:
+        i = bisect_left(x.key, k, 0, x.n)  # First key that is not smaller than `k`
+        if i < x.n and k == x.key[i]:
+            return x, i
+        if x.leaf:
+            return None
         # disk_read(x.c[i])
-        return b_tree_search(x.c[i], k)
+        x = x.c[i]
 
 
 def b_tree_create(T):
@@ -74,7 +93,7 @@ def b_tree_create(T):
     :param BTree T: B-Tree instance.
 
     """
-    x = Node()
+    x = Node(T.t)
     x.leaf = True
     x.n = 0
     # disk_write(x)
@@ -92,7 +111,7 @@ def b_tree_split_child(x, i):
     height by one.
 
     After the split operation, a node might end up containing unused "leftover" keys
-    beyond :math:`n`.
+    beyond :math:`n`. Minimum degree is implied by the size of the key array of a node.
 
     Complexity:
         :math:`\\theta(t)`. The procedure performs :math:`O(1)` disk operations.
@@ -102,22 +121,19 @@ def b_tree_split_child(x, i):
     :param int i: Index of a full child node.
 
     """
-    z = Node()
+    t = len(x.c) // 2
+    z = Node(t)
     y = x.c[i]  # The child to split
     z.leaf = y.leaf
     # `z` takes the largest `t-1` keys and corresponding `t` children of `y`
     z.n = t - 1
-    for j in range(0, t - 1):
-        z.key[j] = y.key[j + t]
+    z.key[:t - 1] = y.key[t:]
     if not y.leaf:
-        for j in range(0, t):
-            z.c[j] = y.c[j + t]
+        z.c[:t] = y.c[t:]
     y.n = t - 1  # Adjust the key count for `y`
-    for j in range(x.n, i, -1):
-        x.c[j + 1] = x.c[j]  # Shift `x`'s children to the right
+    x.c[i + 2:x.n + 2] = x.c[i + 1:x.n + 1]  # Shift `x`'s children to the right
     x.c[i + 1] = z  # `z` becomes a new child of `x`
-    for j in range(x.n - 1, i - 1, -1):
-        x.key[j + 1] = x.key[j]  # Shift `x`'s keys to the right
+    x.key[i + 1:x.n + 1] = x.key[i:x.n]  # Shift `x`'s keys to the right
     x.key[i] = y.key[t - 1]  # Move the median key to `x`
     x.n = x.n + 1
     # disk_write(y)
@@ -128,8 +144,8 @@ def b_tree_split_child(x, i):
 def b_tree_insert(T, k):
     """Inserts a key into a B-Tree.
 
-    The procedure uses :func:`b_tree_split_child()` to guarantee that the recursion never
-    descents to a full node.
+    The procedure uses :func:`b_tree_split_child()` to guarantee that the descent never
+    reaches a full node.
 
     Complexity:
         :math:`O(th)=O(t\\log_t n)`, where :math:`h` is the height of the B-tree and
@@ -141,8 +157,8 @@ def b_tree_insert(T, k):
 
     """
     r = T.root
-    if r.n == 2 * t - 1:
-        s = Node()
+    if r.n == 2 * T.t - 1:
+        s = Node(T.t)
         T.root = s
         s.leaf = False
         s.n = 0
@@ -158,7 +174,8 @@ def b_tree_insert_nonfull(x, k):
 
     The case in which :math:`x` is a leaf is trivial. We simply write a new key to its
     appropriate location. If :math:`x` is not a leaf node, then we must insert :math:`k`
-    into the appropriate leaf node in the subtree rooted at internal node :math:`x`.
+    into the appropriate leaf node in the subtree rooted at internal node :math:`x`. The
+    descent is a loop, and positions in nodes are found with a binary search.
 
     Complexity:
         :math:`O(th)=O(t\\log_t n)`. The number of pages that need to be in memory at any
@@ -168,23 +185,62 @@ def b_tree_insert_nonfull(x, k):
     :param object k: New key.
 
     """
-    i = x.n - 1
-    if x.leaf:
-        while i >= 0 and k < x.key[i]:
-            x.key[i + 1] = x.key[i]  # Shift keys to the right
-            i -= 1
-        x.key[i + 1] = k
-        x.n += 1
-        # disk_write(x)
-    else:
-        # Find the child to which the recursion would descend
-        while i >= 0 and k < x.key[i]:
-            i -= 1
-        i += 1
+    while not x.leaf:
+        # Find the child to descend to
+        i = bisect_right(x.key, k, 0, x.n)
         # disk_read(x.c[i])
-        if x.c[i].n == 2 * t - 1:  # The child is full
+        if x.c[i].n == len(x.key):  # The child is full
             b_tree_split_child(x, i)
             # Find which of the two children is now the correct one to descend to
             if k > x.key[i]:
                 i += 1
-        b_tree_insert_nonfull(x.c[i], k)
+        x = x.c[i]
+    i = bisect_right(x.key, k, 0, x.n)
+    x.key[i + 1:x.n + 1] = x.key[i:x.n]  # Shift keys to the right
+    x.key[i] = k
+    x.n += 1
+    # disk_write(x)
+
+
+def lookup_benchmark(n=100000, degrees=(2, 8, 32, 64, 128, 256), q=100000, seed=0):
+    """Measures lookup throughput of B-trees of different degrees and of an AVL tree.
+
+    All trees are filled with the same :math:`n` random keys, and then answer the same
+    :math:`q` lookups, half of which are hits.
+
+    :param int n: (optional) Number of keys.
+    :param tuple degrees: (optional) Minimum degrees of B-trees.
+    :param int q: (optional) Number of lookups.
+    :param int seed: (optional) Random seed.
+    :return: Dictionary of lookups per second keyed by ``"t=..."`` labels and ``"avl"``.
+
+    """
+    from random import Random
+    from time import perf_counter
+
+    from trees.avl import AVLTree, Node as AVLNode, avl_insert
+    from trees.bst import iterative_tree_search
+
+    R = Random(seed)
+    K = R.sample(range(4 * n), n)
+    Q = [K[R.randrange(n)] if R.random() < 0.5 else R.randrange(4 * n) for _ in range(q)]
+    out = {}
+    for t in degrees:
+        T = BTree(t)
+        b_tree_create(T)
+        for k in K:
+            b_tree_insert(T, k)
+        r = T.root
+        s = perf_counter()
+        for k in Q:
+            b_tree_search(r, k)
+        out["t=" + str(t)] = q / (perf_counter() - s)
+    T = AVLTree()
+    for k in K:
+        avl_insert(T, AVLNode(k))
+    r = T.root
+    s = perf_counter()
+    for k in Q:
+        iterative_tree_search(r, k)
+    out["avl"] = q / (perf_counter() - s)
+    return out
@@ -35,6 +35,7 @@ class Node:
 
     Holds a value of any type (called a key) and pointers to its left and/or right child.
     """
+    __slots__ = ("key", "left", "right")
 
     def __init__(self, key):
         """Node of a binary tree.
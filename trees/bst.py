@@ -13,7 +13,9 @@ and any value in a right subtree will be larger.
 
 In-order printing of nodes in a BST will produce a sorted output of its values. Augmented
 BST nodes with more properties offer more efficient operations in a handful of
-applications.
+applications. Every node here is augmented with the **size** of its subtree, which is kept
+up to date by insertion, deletion and rotations, and allows to find the :math:`i`-th
+smallest key and the rank of a key in :math:`O(h)` time.
 
 Most BST operations take :math:`O(h)` time where *h* is a height of a tree. If a tree is
 perfectly complete and **balanced**, *h* will be *log(n)*. In worst case, with all the
@@ -31,7 +33,10 @@ class BST(BinaryTree):
 
 class Node(BinaryTreeNode):
     """An augmented variant of a BinaryTreeNode with a pointer to its parent.
+
+    Node also holds the number of nodes in its subtree.
     """
+    __slots__ = ("p", "size")
 
     def __init__(self, key):
         """An augmented variant of a BinaryTreeNode with a pointer to its parent.
@@ -41,6 +46,7 @@ class Node(BinaryTreeNode):
         """
         super().__init__(key)
         self.p = None
+        self.size = 1
 
 
 def tree_search(x, k):
@@ -76,7 +82,7 @@ def iterative_tree_search(x, k):
     :return: A found node or :data:`None` if a key was not found in a tree.
 
     """
-    while k is not None and k != x.key:
+    while x is not None and k != x.key:
         if k < x.key:
             x = x.left
         elif k > x.key:
@@ -167,6 +173,165 @@ def tree_predecessor(x):
         return y
 
 
+def tree_floor(x, k):
+    """Returns a node with the largest key that is not larger than a given key.
+
+    Search descends from the root as if looking for the key. Every node on the way with
+    a key not larger than :math:`k` is a candidate, and the last candidate is the closest.
+
+    Complexity:
+        :math:`O(h)` where :math:`h` is the height of a tree.
+
+    :param trees.bst.Node x: Root node.
+    :param object k: A key to search.
+    :return: Floor node or :data:`None` if all keys are larger.
+
+    """
+    y = None
+    while x is not None:
+        if k == x.key:
+            return x
+        elif k < x.key:
+            x = x.left
+        else:
+            y = x  # Closest key so far
+            x = x.right
+    return y
+
+
+def tree_ceiling(x, k):
+    """Returns a node with the smallest key that is not smaller than a given key.
+
+    Mirrors :func:`tree_floor()`.
+
+    Complexity:
+        :math:`O(h)` where :math:`h` is the height of a tree.
+
+    :param trees.bst.Node x: Root node.
+    :param object k: A key to search.
+    :return: Ceiling node or :data:`None` if all keys are smaller.
+
+    """
+    y = None
+    while x is not None:
+        if k == x.key:
+            return x
+        elif k > x.key:
+            x = x.right
+        else:
+            y = x  # Closest key so far
+            x = x.left
+    return y
+
+
+def tree_range(x, lo=None, hi=None):
+    """Iterates through nodes with keys in a half-open range in sorted order.
+
+    Search starts with the ceiling node of the lower bound and follows successors until
+    the upper bound is reached. Like in :func:`successor_order()`, every edge is traversed
+    at most twice.
+
+    Complexity:
+        :math:`O(h+k)` where :math:`h` is the height of a tree and :math:`k` is the number
+        of nodes in the range.
+
+    :param trees.bst.Node x: Root node.
+    :param object lo: (optional) Lower bound, inclusive. Unbounded by default.
+    :param object hi: (optional) Upper bound, exclusive. Unbounded by default.
+    :return: Next node in the range.
+
+    """
+    if x is None:
+        return
+    y = tree_minimum(x) if lo is None else tree_ceiling(x, lo)
+    while y is not None and (hi is None or y.key < hi):
+        yield y
+        y = tree_successor(y)
+
+
+def size(x):
+    """Returns size attribute of a node.
+
+    Null nodes have a size of :math:`0`.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param trees.bst.Node x: Subject node.
+    :return int: Number of nodes in a subtree.
+
+    """
+    if x is None:
+        return 0
+    else:
+        return x.size
+
+
+def update_size(x):
+    """Calculates and updates the size attribute of a node.
+
+    This algorithm assumes that the size attributes of children nodes are correct.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param trees.bst.Node x: Subject node.
+
+    """
+    x.size = size(x.left) + size(x.right) + 1
+
+
+def tree_select(x, i):
+    """Returns a node with the :math:`i`-th smallest key.
+
+    Left subtree of a node holds exactly :math:`r=size(x.left)` smaller keys. The node is
+    the answer if :math:`i=r`, otherwise the search continues on the left, or on the right
+    for the :math:`(i-r-1)`-th smallest key.
+
+    Complexity:
+        :math:`O(h)` where :math:`h` is the height of a tree.
+
+    :param trees.bst.Node x: Root node.
+    :param int i: Zero-based rank of a key.
+    :return: Node with the :math:`i`-th smallest key.
+
+    """
+    if not 0 <= i < size(x):
+        raise IndexError("Rank out of range")
+    while True:
+        r = size(x.left)
+        if i == r:
+            return x
+        elif i < r:
+            x = x.left
+        else:
+            i -= r + 1
+            x = x.right
+
+
+def tree_rank(x, k):
+    """Returns the number of keys that are smaller than a given key.
+
+    Every time the search goes right, the node and its left subtree are counted.
+
+    Complexity:
+        :math:`O(h)` where :math:`h` is the height of a tree.
+
+    :param trees.bst.Node x: Root node.
+    :param object k: A key, not necessarily present in a tree.
+    :return: Rank of a key.
+
+    """
+    r = 0
+    while x is not None:
+        if k <= x.key:
+            x = x.left
+        else:
+            r += size(x.left) + 1
+            x = x.right
+    return r
+
+
 def tree_insert(T, z):
     """Inserts a new node into BST.
 
@@ -198,6 +363,9 @@ def tree_insert(T, z):
         y.left = z
     elif z.key > y.key:
         y.right = z
+    while y is not None:  # Every ancestor gains a node
+        y.size += 1
+        y = y.p
 
 
 def transplant(T, u, v):
@@ -230,7 +398,8 @@ def tree_delete(T, z):
     """Removes a node from a BST while maintaining the BST properties.
 
     This algorithm organizes its cases according to node location in a tree. These cases
-    are described in detail in inline comments.
+    are described in detail in inline comments. Subtree sizes are updated from the lowest
+    node whose subtree has changed up to the root.
 
     Complexity:
         :math:`O(h)` where :math:`h` is the height of a tree, worst case :math:`\log n`.
@@ -240,18 +409,25 @@ def tree_delete(T, z):
 
     """
     if z.left is None:  # `z` has only right child
+        x = z.p  # Lowest node with a changed subtree
         transplant(T, z, z.right)
     elif z.right is None:  # `z` has only left child
+        x = z.p
         transplant(T, z, z.left)
     else:  # `z` has both left and right child
         y = tree_minimum(z.right)  # `z`'s successor
+        x = y
         if y.p is not z:  # Successor is not `z`'s right child
+            x = y.p
             transplant(T, y, y.right)
             y.right = z.right
             y.right.p = y
         transplant(T, z, y)  # Successor is `z`'s right child
         y.left = z.left
         y.left.p = y
+    while x is not None:
+        update_size(x)
+        x = x.p
 
 
 def left_rotate(T, x):
@@ -264,7 +440,8 @@ def left_rotate(T, x):
     Order of operations is important so that no pointers are lost in the process. The
     method is accompanied by step-by-step inline comments to help remember these. In-order
     traversal of a tree should remain the same after rotation, thus proving that the
-    rotation did not damage BST properties.
+    rotation did not damage BST properties. Subtree of :math:`y` takes the size of the
+    subtree of :math:`x`, and the size of :math:`x` is recomputed from its new children.
 
     Complexity:
         :math:`O(1)`.
@@ -288,6 +465,8 @@ def left_rotate(T, x):
         x.p.right = y
     y.left = x
     x.p = y
+    y.size = x.size
+    update_size(x)
 
 
 def right_rotate(T, x):
@@ -308,6 +487,8 @@ def right_rotate(T, x):
         x.p.left = y
     y.right = x
     x.p = y
+    y.size = x.size
+    update_size(x)
 
 
 def successor_order(x, f):
@@ -0,0 +1,182 @@
+"""
+Interval Tree
+=============
+
+Interval tree is a dynamic set of closed intervals :math:`[a, b]` that answers which
+intervals **overlap** a given interval. Two intervals :math:`[a, b]` and :math:`[c, d]`
+overlap if :math:`a ≤ d` and :math:`c ≤ b`. A **stabbing query** asks for all intervals
+that contain a given point, which is an overlap query with :math:`a=b`.
+
+This implementation augments an AVL tree, see :mod:`trees.avl`. Intervals are ordered by
+their low endpoints, and every node also holds the maximum high endpoint :math:`max` of
+all the intervals in its subtree. The attribute is computed from the node and its children
+only, so it is kept up to date by :func:`trees.avl.avl_rebalance()` together with the
+heights, on every node whose children have changed.
+
+With the :math:`max` attribute a search can skip a whole subtree if its :math:`max` is
+smaller than the low endpoint of a query, since no interval in it reaches the query. And
+it can skip the right subtree of a node whose low endpoint is larger than the high endpoint
+of a query, since all intervals there start even later.
+"""
+from trees.avl import AVLTree, Node as AVLNode
+from trees.avl import avl_insert, avl_delete, update_height
+
+
+class IntervalTree(AVLTree):
+    """A dynamic set of intervals based on an AVL tree.
+    """
+
+    def __init__(self):
+        """A dynamic set of intervals based on an AVL tree.
+        """
+        super().__init__()
+        self.i = 0  # Sequence number of the next interval
+
+
+class Node(AVLNode):
+    """An augmented AVL node holding an interval.
+
+    Node key is a tuple of the low endpoint, the high endpoint and a sequence number, so
+    that equal intervals can be stored and keys are ordered by the low endpoint.
+    """
+    __slots__ = ("high", "max", "value")
+
+    def __init__(self, key, value=None):
+        """An augmented AVL node holding an interval.
+
+        :param tuple key: Low endpoint, high endpoint and a sequence number.
+        :param object value: (optional) Value associated with an interval.
+
+        """
+        super().__init__(key)
+        self.high = key[1]  # High endpoint
+        self.max = key[1]  # Maximum high endpoint in a subtree
+        self.value = value
+
+
+def update_max(x):
+    """Updates the height and the maximum high endpoint of a node.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param trees.interval.Node x: Subject node.
+
+    """
+    update_height(x)
+    m = x.high
+    if x.left is not None and x.left.max > m:
+        m = x.left.max
+    if x.right is not None and x.right.max > m:
+        m = x.right.max
+    x.max = m
+
+
+def interval_insert(T, a, b, value=None):
+    """Inserts an interval into an interval tree.
+
+    Complexity:
+        :math:`O(\\log n)`.
+
+    :param IntervalTree T: Interval tree.
+    :param object a: Low endpoint.
+    :param object b: High endpoint.
+    :param object value: (optional) Value associated with an interval.
+    :return: New node, which can be passed to :func:`interval_delete()`.
+
+    """
+    if b < a:
+        raise ValueError("Invalid interval")
+    z = Node((a, b, T.i), value)
+    T.i += 1
+    avl_insert(T, z, update_max)
+    return z
+
+
+def interval_delete(T, z):
+    """Removes an interval from an interval tree.
+
+    Complexity:
+        :math:`O(\\log n)`.
+
+    :param IntervalTree T: Interval tree.
+    :param trees.interval.Node z: Node of an interval.
+
+    """
+    avl_delete(T, z, update_max)
+
+
+def interval_search(T, a, b):
+    """Finds an interval that overlaps a given interval.
+
+    Search goes left whenever the left subtree reaches the query, since if no interval
+    there overlaps the query, then none on the right does either: they all start after an
+    interval on the left that ends before the query starts.
+
+    Complexity:
+        :math:`O(\\log n)`.
+
+    :param IntervalTree T: Interval tree.
+    :param object a: Low endpoint of a query.
+    :param object b: High endpoint of a query.
+    :return: Node of an overlapping interval or :data:`None` if there is none.
+
+    """
+    x = T.root
+    while x is not None and not (x.key[0] <= b and a <= x.high):
+        if x.left is not None and x.left.max >= a:
+            x = x.left
+        else:
+            x = x.right
+    return x
+
+
+def interval_overlaps(T, a, b):
+    """Finds all intervals that overlap a given interval.
+
+    Subtrees are skipped by their maximum high endpoints and by the low endpoints of their
+    roots, and the rest of the tree is traversed in order with an explicit stack.
+
+    Complexity:
+        :math:`O(\\log n+k\\log n)` in the worst case, where :math:`k` is the number of
+        reported intervals. Every visited subtree either contains a reported interval or
+        borders the search path, which usually makes the search close to
+        :math:`O(\\log n+k)`.
+
+    :param IntervalTree T: Interval tree.
+    :param object a: Low endpoint of a query.
+    :param object b: High endpoint of a query.
+    :return: List of nodes of overlapping intervals, ordered by their low endpoints.
+
+    """
+    out = []
+    S = []  # Nodes whose left subtree is explored, but the node and its right are not
+    x = T.root
+    while x is not None or len(S) > 0:
+        if x is not None and x.max >= a:
+            S.append(x)
+            x = x.left
+        else:
+            if len(S) == 0:
+                break
+            x = S.pop()
+            if x.key[0] > b:  # Neither `x` nor its right subtree can overlap
+                break
+            if a <= x.high:
+                out.append(x)
+            x = x.right
+    return out
+
+
+def interval_stab(T, p):
+    """Finds all intervals that contain a given point.
+
+    Complexity:
+        Same as :func:`interval_overlaps()`.
+
+    :param IntervalTree T: Interval tree.
+    :param object p: Query point.
+    :return: List of nodes of intervals containing a point, ordered by their low endpoints.
+
+    """
+    return interval_overlaps(T, p, p)
@@ -13,9 +13,15 @@ A red-black tree is a binary tree that satisfies the following red black propert
     5. For each node, all simple paths from the node to descendant leaves contain the same number of black nodes.
 
 The number of black nodes on any simple path from, but not including, a node :math:`x` down to a leaf is called the **black-height** of the node, denoted :math:`bh(x)`.
+
+Leaves are represented with null pointers rather than with a sentinel node, so the color of a missing child is read with :func:`color()`, and the procedures that may reach a null node keep track of its parent explicitly.
 """
+from collections import deque
+
 from trees.bst import BST, Node as BSTNode
-from trees.bst import left_rotate, right_rotate
+from trees.bst import left_rotate, right_rotate, transplant
+from trees.bst import iterative_tree_search, tree_minimum, tree_floor, tree_ceiling
+from trees.bst import tree_range, tree_select, tree_rank, update_size
 
 
 class RedBlackTree(BST):
@@ -26,31 +32,265 @@ class RedBlackTree(BST):
 
 class Node(BSTNode):
     """An augmented BST node with an additional color bit.
+
+    Node also holds a value associated with its key, so that a tree can serve as a map.
     """
+    __slots__ = ("color", "value")
 
-    def __init__(self, key):
+    def __init__(self, key, value=None):
         """An augmented BST node with an additional color bit.
 
         :param object key: Node's key.
+        :param object value: (optional) Value associated with the key.
 
         """
         super().__init__(key)
         self.color = None
+        self.value = value
+
+
+class SortedMap:
+    """Ordered map of unique keys backed by a red-black tree.
+
+    Unlike :data:`dict`, keys are kept in sorted order, which allows to answer floor and
+    ceiling queries and to iterate through a range of keys.
+    """
+
+    def __init__(self, items=None):
+        """Ordered map of unique keys backed by a red-black tree.
+
+        :param list[tuple] items: (optional) Key-value pairs sorted by strictly increasing
+         keys, loaded in linear time with :func:`rb_bulk_load()`.
+
+        """
+        self.T = RedBlackTree()
+        self.n = 0  # Number of keys
+        if items is not None:
+            self.n = rb_bulk_load(self.T, items)
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, k):
+        return iterative_tree_search(self.T.root, k) is not None
+
+    def __iter__(self):
+        for x in tree_range(self.T.root):
+            yield x.key
+
+    def get(self, k, default=None):
+        """Returns a value associated with a key.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param object k: Key to look up.
+        :param object default: (optional) Value to return if a key is not found.
+        :return: Value of a key or the default value.
+
+        """
+        x = iterative_tree_search(self.T.root, k)
+        return default if x is None else x.value
+
+    def put(self, k, v):
+        """Associates a value with a key, replacing the old value if a key exists.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param object k: Key.
+        :param object v: Value.
+
+        """
+        x = iterative_tree_search(self.T.root, k)
+        if x is None:
+            rb_insert(self.T, Node(k, v))
+            self.n += 1
+        else:
+            x.value = v
+
+    def delete(self, k):
+        """Removes a key and its value.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param object k: Key to remove.
+        :return: Value of a removed key.
+
+        """
+        x = iterative_tree_search(self.T.root, k)
+        if x is None:
+            raise KeyError(k)
+        rb_delete(self.T, x)
+        self.n -= 1
+        return x.value
+
+    def floor(self, k):
+        """Returns the largest key that is not larger than a given key.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param object k: Key to compare with.
+        :return: Floor key or :data:`None` if all keys are larger.
+
+        """
+        x = tree_floor(self.T.root, k)
+        return None if x is None else x.key
+
+    def ceiling(self, k):
+        """Returns the smallest key that is not smaller than a given key.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param object k: Key to compare with.
+        :return: Ceiling key or :data:`None` if all keys are smaller.
+
+        """
+        x = tree_ceiling(self.T.root, k)
+        return None if x is None else x.key
+
+    def range(self, lo=None, hi=None):
+        """Iterates through key-value pairs with keys in a half-open range in sorted order.
+
+        The map must not be modified during the iteration.
+
+        Complexity:
+            :math:`O(\\log n+k)` where :math:`k` is the number of keys in the range.
+
+        :param object lo: (optional) Lower bound, inclusive. Unbounded by default.
+        :param object hi: (optional) Upper bound, exclusive. Unbounded by default.
+        :return: Next tuple of a key and a value.
+
+        """
+        for x in tree_range(self.T.root, lo, hi):
+            yield x.key, x.value
+
+    def select(self, i):
+        """Returns the :math:`i`-th smallest key.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param int i: Zero-based rank of a key.
+        :return: Key of a given rank.
+
+        """
+        return tree_select(self.T.root, i).key
+
+    def rank(self, k):
+        """Returns the number of keys that are smaller than a given key.
+
+        Complexity:
+            :math:`O(\\log n)`.
+
+        :param object k: Key, not necessarily present in a map.
+        :return: Rank of a key.
+
+        """
+        return tree_rank(self.T.root, k)
+
+
+class PercentileWindow:
+    """Percentiles of a sliding window over a stream of values.
+
+    Window holds the last :math:`w` values in arrival order and in a red-black tree.
+    Values may repeat, so every value is keyed by a tuple of the value and its sequence
+    number. Percentiles are answered with :func:`trees.bst.tree_select()`.
+    """
+
+    def __init__(self, w):
+        """Percentiles of a sliding window over a stream of values.
+
+        :param int w: Window size.
+
+        """
+        if w < 1:
+            raise ValueError("Window size must be positive")
+        self.w = w
+        self.T = RedBlackTree()
+        self.Q = deque()  # Nodes in arrival order
+        self.i = 0  # Sequence number of the next value
+
+    def __len__(self):
+        return len(self.Q)
+
+    def add(self, x):
+        """Adds a value to a window, and drops the oldest value if a window is full.
+
+        Complexity:
+            :math:`O(\\log w)`.
+
+        :param object x: New value.
+
+        """
+        if len(self.Q) == self.w:
+            rb_delete(self.T, self.Q.popleft())
+        z = Node((x, self.i))
+        self.i += 1
+        rb_insert(self.T, z)
+        self.Q.append(z)
+
+    def percentile(self, q):
+        """Returns a percentile of the values in a window.
+
+        Uses the nearest-rank definition: the smallest value such that at least
+        :math:`q` percent of the values are not larger.
+
+        Complexity:
+            :math:`O(\\log w)`.
+
+        :param float q: Percentile, from 0 to 100.
+        :return: Value of a percentile.
+
+        """
+        n = len(self.Q)
+        if n == 0:
+            raise ValueError("Window is empty")
+        if not 0 <= q <= 100:
+            raise ValueError("Percentile out of range")
+        i = max(0, -(-q * n // 100) - 1)  # Ceiling of `q * n / 100`, minus one
+        return tree_select(self.T.root, int(i)).key[0]
+
+
+def color(x):
+    """Returns the color of a node.
+
+    Null pointers are leaves and are black by red-black property 3.
+
+    Complexity:
+        :math:`O(1)`.
+
+    :param trees.red_black.Node x: Subject node or :data:`None`.
+    :return: Color of a node.
+
+    """
+    return BLACK if x is None else x.color
 
 
 def rb_insert(T, z):
-    """TODO
+    """Inserts a new node into a red-black tree.
+
+    Node is inserted as in :func:`trees.bst.tree_insert()` and colored red. This may only
+    violate property 2, if the new node is the root, or property 4, if its parent is red.
+    Both are restored by :func:`rb_insert_fixup()`.
+
+    Complexity:
+        :math:`O(\\log n)`.
 
     :param RedBlackTree T: Instance of Red-Black Tree to update.
     :param trees.red_black.Node z: Node to insert.
-    :return:
 
     """
     y = None
     x = T.root
     while x is not None:
         y = x
-        if z.key < x.key:
+        if z.key == x.key:
+            raise ValueError("Duplicate keys")
+        elif z.key < x.key:
             x = x.left
         else:
             x = x.right
@@ -63,34 +303,246 @@ def rb_insert(T, z):
         y.right = z
     z.left = None
     z.right = None
+    z.size = 1
     z.color = RED
+    while y is not None:  # Every ancestor gains a node
+        y.size += 1
+        y = y.p
     rb_insert_fixup(T, z)
 
 
 def rb_insert_fixup(T, z):
-    """TODO
+    """Restores red-black properties after an insertion.
+
+    While both :math:`z` and its parent are red, there are three cases depending on the
+    uncle of :math:`z`, the sibling of its parent:
+
+    1. The uncle is red. Parent and uncle are recolored black and the grandparent is
+       recolored red, which moves the violation two levels up.
+    2. The uncle is black and :math:`z` is an inner grandchild. A rotation around the
+       parent makes it an outer grandchild, which is case 3.
+    3. The uncle is black and :math:`z` is an outer grandchild. Recoloring and a rotation
+       around the grandparent end the loop.
 
-    :param RedBlackTree T:
-    :param trees.red_black.Node z:
+    Each case has a mirror image depending on which side of the grandparent the parent of
+    :math:`z` is.
+
+    Complexity:
+        :math:`O(\\log n)`, with at most two rotations.
+
+    :param RedBlackTree T: Instance of Red-Black Tree to update.
+    :param trees.red_black.Node z: Inserted node.
 
     """
-    while z.p.color == RED:
-        if z.p == z.p.p.left:
-            y = z.p.p.right
-            if y.color == RED:
+    while color(z.p) == RED:  # Red parent is never the root, so the grandparent exists
+        if z.p is z.p.p.left:
+            y = z.p.p.right  # Uncle
+            if color(y) == RED:  # Case 1
+                z.p.color = BLACK
+                y.color = BLACK
+                z.p.p.color = RED
+                z = z.p.p
+            else:
+                if z is z.p.right:  # Case 2
+                    z = z.p
+                    left_rotate(T, z)
+                z.p.color = BLACK  # Case 3
+                z.p.p.color = RED
+                right_rotate(T, z.p.p)
+        else:
+            y = z.p.p.left  # Uncle
+            if color(y) == RED:  # Case 1
                 z.p.color = BLACK
                 y.color = BLACK
                 z.p.p.color = RED
                 z = z.p.p
-            elif z == z.p.right:
-                z = z.p
-                left_rotate(T, z)
-            z.p.color = BLACK
-            z.p.p.color = RED
-            right_rotate(T, z.p.p)
+            else:
+                if z is z.p.left:  # Case 2
+                    z = z.p
+                    right_rotate(T, z)
+                z.p.color = BLACK  # Case 3
+                z.p.p.color = RED
+                left_rotate(T, z.p.p)
+    T.root.color = BLACK
+
+
+def rb_delete(T, z):
+    """Removes a node from a red-black tree.
 
+    Node is removed as in :func:`trees.bst.tree_delete()`. If :math:`z` has two children,
+    its successor :math:`y` takes its place and its color, so the node that is actually
+    removed from its position is :math:`y`. If that node was black, the paths through its
+    replacement :math:`x` lack one black node, which is fixed by :func:`rb_delete_fixup()`.
+    Subtree sizes are updated before the fixup, from the parent of :math:`x` up to the
+    root, and the rotations of the fixup keep them up to date.
 
-# TODO
+    Complexity:
+        :math:`O(\\log n)`.
 
+    :param RedBlackTree T: Instance of Red-Black Tree to update.
+    :param trees.red_black.Node z: Node to remove.
+
+    """
+    y = z
+    y_color = y.color
+    if z.left is None:
+        x, xp = z.right, z.p
+        transplant(T, z, z.right)
+    elif z.right is None:
+        x, xp = z.left, z.p
+        transplant(T, z, z.left)
+    else:
+        y = tree_minimum(z.right)  # `z`'s successor
+        y_color = y.color
+        x = y.right
+        if y.p is z:
+            xp = y
+        else:
+            xp = y.p
+            transplant(T, y, y.right)
+            y.right = z.right
+            y.right.p = y
+        transplant(T, z, y)
+        y.left = z.left
+        y.left.p = y
+        y.color = z.color
+    w = xp  # Lowest node with a changed subtree
+    while w is not None:
+        update_size(w)
+        w = w.p
+    if y_color == BLACK:
+        rb_delete_fixup(T, x, xp)
+
+
+def rb_delete_fixup(T, x, p):
+    """Restores red-black properties after a deletion.
+
+    Node :math:`x` carries an "extra black" that has to be pushed up the tree until it
+    reaches a red node, which is recolored black, or the root, where it is dropped. There
+    are four cases depending on the sibling :math:`w` of :math:`x`:
+
+    1. The sibling is red. Recoloring and a rotation around the parent give :math:`x` a
+       black sibling, which is one of the cases 2-4.
+    2. The sibling is black with two black children. Sibling is recolored red, and the
+       extra black moves up to the parent.
+    3. The sibling is black, its inner child is red and its outer child is black. Rotation
+       around the sibling makes the outer child red, which is case 4.
+    4. The sibling is black and its outer child is red. Recoloring and a rotation around
+       the parent remove the extra black and end the loop.
+
+    Each case has a mirror image depending on which side of the parent :math:`x` is.
+
+    Complexity:
+        :math:`O(\\log n)`, with at most three rotations.
+
+    :param RedBlackTree T: Instance of Red-Black Tree to update.
+    :param trees.red_black.Node x: Node that replaced the removed node, or :data:`None`.
+    :param trees.red_black.Node p: Parent of :math:`x`.
+
+    """
+    while x is not T.root and color(x) == BLACK:
+        if x is p.left:
+            w = p.right  # Sibling, never null since it has a black-height of at least 1
+            if w.color == RED:  # Case 1
+                w.color = BLACK
+                p.color = RED
+                left_rotate(T, p)
+                w = p.right
+            if color(w.left) == BLACK and color(w.right) == BLACK:  # Case 2
+                w.color = RED
+                x, p = p, p.p
+            else:
+                if color(w.right) == BLACK:  # Case 3
+                    w.left.color = BLACK
+                    w.color = RED
+                    right_rotate(T, w)
+                    w = p.right
+                w.color = p.color  # Case 4
+                p.color = BLACK
+                w.right.color = BLACK
+                left_rotate(T, p)
+                x = T.root
+        else:
+            w = p.left
+            if w.color == RED:  # Case 1
+                w.color = BLACK
+                p.color = RED
+                right_rotate(T, p)
+                w = p.left
+            if color(w.left) == BLACK and color(w.right) == BLACK:  # Case 2
+                w.color = RED
+                x, p = p, p.p
+            else:
+                if color(w.left) == BLACK:  # Case 3
+                    w.right.color = BLACK
+                    w.color = RED
+                    left_rotate(T, w)
+                    w = p.left
+                w.color = p.color  # Case 4
+                p.color = BLACK
+                w.left.color = BLACK
+                right_rotate(T, p)
+                x = T.root
+    if x is not None:
+        x.color = BLACK
+
+
+def rb_bulk_load(T, A):
+    """Builds a red-black tree out of sorted key-value pairs.
+
+    Middle pair becomes the root, and both halves are built recursively, which gives a tree
+    of the minimal height :math:`h=\\lfloor\\log_2 n\\rfloor`. Sizes of sibling subtrees
+    differ by at most one, so every null pointer is at depth :math:`h` or :math:`h+1`.
+    Coloring all nodes of the lowest level :math:`h` red and the others black gives every
+    path the same black-height and no red node a red child.
+
+    Complexity:
+        :math:`O(n)`, with :math:`O(\\log n)` recursion depth.
+
+    :param RedBlackTree T: Instance of Red-Black Tree to fill. Existing nodes are dropped.
+    :param list[tuple] A: Key-value pairs sorted by strictly increasing keys.
+    :return: Number of loaded pairs.
+
+    """
+    A = list(A)
+    for i in range(1, len(A)):
+        if not A[i - 1][0] < A[i][0]:
+            raise ValueError("Keys are not strictly increasing")
+    h = len(A).bit_length() - 1  # Depth of the lowest level
+    T.root = build_subtree(A, 0, len(A), h)
+    if T.root is not None:
+        T.root.p = None
+    return len(A)
+
+
+"""
+Constants and subroutines used in red-black trees
+"""
 BLACK = 0
 RED = 1
+
+
+def build_subtree(A, lo, hi, h, depth=0):
+    """Builds a balanced subtree out of a range of sorted key-value pairs.
+
+    :param list[tuple] A: Key-value pairs sorted by strictly increasing keys.
+    :param int lo: First index of a range.
+    :param int hi: Index past the end of a range.
+    :param int h: Depth of the lowest level of a tree, which is colored red.
+    :param int depth: (optional) Depth of the subtree root.
+    :return: Root node of a subtree, or :data:`None` for an empty range.
+
+    """
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    x = Node(A[mid][0], A[mid][1])
+    x.color = RED if depth == h and depth > 0 else BLACK
+    x.size = hi - lo
+    x.left = build_subtree(A, lo, mid, h, depth + 1)
+    x.right = build_subtree(A, mid + 1, hi, h, depth + 1)
+    if x.left is not None:
+        x.left.p = x
+    if x.right is not None:
+        x.right.p = x
+    return x